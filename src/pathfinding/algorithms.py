@@ -1,240 +1,344 @@
-"""algorithms.py module"""
+"""algorithms.py module
 
-import time
-from queue import PriorityQueue, Queue, LifoQueue
+Animated front-end of the solvers module. The searches themselves run in
+solvers; this module paints their progress on the PathCube objects and makes
+the character cube walk through the path found.
 
-from . import cubes
+The functions below return generators, which an Animation object advances a
+few steps per frame from the application's loop. They yield None after each
+cell expanded by their search, and the seconds to wait after each move of
+the cube, and finally return a tuple (found, visited, path_len, path_cost,
+bound), bound being the factor by which the path may cost more than the
+cheapest one, or None if it's known to be the cheapest or not at all.
+"""
 
-TIME_INTERVAL = 0.01
+import time
 
+from . import cache, cubes, events, grid, hierarchical, incremental
+from .budgets import Budget
 
-def heuristic(cube, objective):
-    """Produces the cost based on the cube position and the objective position
-    using the manhattan method.
+# Seconds waited after each move of the character cube
+WALK_INTERVAL = 0.1
+# Factor of the heuristic of weighted A*, and of the first search of ARA*
+WEIGHTED_EPSILON = 1.5
+ARA_EPSILON = 3.0
+# Most cells ARA* expands before the cube walks the best path found by then
+ARA_MAX_EXPANDED = 1000
 
-    Args:
-        cube: Character cube object that will go through the most optimal path.
+# Results of the searches run by the application. Solving again a terrain
+# that wasn't edited since, from the same cell, skips the search.
+path_cache = cache.PathCache()
 
-        objective: PathCube object which is_objective attribute is true.
 
-    Returns:
-        The cost based on the cube position and the objective position.
+class Animation:
+    """Advances one of the functions of this module a few steps at a time,
+    without blocking the caller, so that several of them can run side by
+    side.
     """
 
-    objt_x, objt_y = objective.get_pos()
-    cub_x, cub_y = cube.get_pos()
-    return (abs((objt_x - cub_x)) + abs((objt_y - cub_y))) // cubes.SIDE_LENGTH
+    def __init__(self, steps):
+        """Initialise the object.
 
+        Args:
+            steps: Generator returned by one of the functions of this
+                   module.
+        """
 
-def reconstruct_path(came_from, current):
-    """Produces a list containing the most optimal nodes.
+        self.steps = steps
+        # Tuple returned by steps once finished
+        self.result = None
+        self._resume_at = 0
 
-    Args:
-        came_from: dict object used to keep track of the node immediately
-                   preceding each node on the cheapest path from the start node
-                   to that node.
+    @property
+    def finished(self):
+        return self.result is not None
 
-        current: Starting node. the value will change to the next node linked
-                 to this node.
+    def update(self, budget, seconds=None):
+        """Takes some steps, unless waiting after a move of the cube.
 
-    Returns:
-        list object containing the most optimal nodes.
-    """
+        Args:
+            budget: Most steps to take.
+
+            seconds: Optional time after which to stop taking steps, even
+                     if some of the budget is left.
 
-    total_path = [current]
-    while current in came_from.keys():
-        current = came_from[current]
-        total_path.append(current)
-    total_path.reverse()
-    return total_path
+        Returns:
+            True once the animation is finished.
+        """
 
+        now = time.perf_counter()
+        if self.finished or now < self._resume_at:
+            return self.finished
+        deadline = None if seconds is None else now + seconds
 
-def walk(app_scene, cube, to_walk):
+        for _ in range(budget):
+            try:
+                wait = next(self.steps)
+            except StopIteration as stop:
+                self.result = stop.value
+                return True
+            if wait:
+                self._resume_at = time.perf_counter() + wait
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return False
+
+    def cancel(self):
+        """Stops the animation where it is."""
+
+        self.steps.close()
+
+
+def walk(cube, to_walk):
     """Make cube walk through all the given pathcubes.
 
      Args:
-        app_scene: scene holding the state 'traversing'
-
         cube: Character cube object instance
 
-        tO_walk: list of PathCube objects to go to in an interval of
-                 0.1 second
-
-    Returns:
-        True whenever the cube finish traversing. False might be
-        returned if the process was canceled by the user in the main
-        thread.
+        to_walk: list of PathCube objects to go to, one every
+                 WALK_INTERVAL seconds.
     """
 
     for path in to_walk:
-        if not app_scene.traversing:
-            return False
-
-        path.rect_color = (255, 165, 0)
+        path.state = grid.PATH
         cube.move(path)
-        time.sleep(0.1)
-    return True
+        yield WALK_INTERVAL
 
 
-def astar(app_scene, cube, paths):  # Thread
-    """A* Algorithm. Produces the most optimal path.
+class SearchView(events.Observer):
+    """Observer painting the progress of a search on the PathCube objects."""
 
-    Args:
-        cube: Character cube object that will go through the most optimal path.
+    def __init__(self, paths):
+        self.state = paths.grid.state
 
-        paths: PathCubeList object.
+    def push(self, cell, g):
+        self.state[cell] = grid.FRONTIER
 
-    Returns:
-        True when the algorithm was able to find a optimal path. Otherwise
-        False.
+    relax = push
+
+    def close(self, cell):
+        self.state[cell] = grid.VISITED
+
+
+class AnytimeView(SearchView):
+    """SearchView also painting each path found by an anytime search,
+    until a cheaper one replaces it.
     """
 
-    open_queue = PriorityQueue()
+    def __init__(self, paths):
+        super().__init__(paths)
+        self.path = set()
 
-    # cameFrom[n] is the node immediately preceding it on the cheapest path
-    # from start to n currently known.
-    came_from = {}
+    def push(self, cell, g):
+        if cell not in self.path:
+            super().push(cell, g)
 
-    g_score = {path: float("inf") for path in paths}
-    f_score = {path: float("inf") for path in paths}
+    relax = push
 
-    # Defining the start pathcube f_cost and putting in the queue
-    start = paths.find_path(cube)
-    g_score[start] = 0
-    start.f_cost = f_score[start] = heuristic(start, paths.get_objective())
-    open_queue.put((0, start))
+    def close(self, cell):
+        if cell not in self.path:
+            super().close(cell)
 
-    visited = set()
+    def path_found(self, path, cost):
+        for cell in self.path:
+            self.state[cell] = grid.VISITED
+        self.path = set(path)
+        for cell in path:
+            self.state[cell] = grid.PATH
 
-    while not open_queue.empty():
-        if not app_scene.traversing:
-            return False
 
-        _, current_node = open_queue.get()
-        if current_node in visited:
-            continue
-        if current_node.is_objective:
-            # Starts running on the paths.
-            path = reconstruct_path(came_from, current_node)
-            return walk(app_scene, cube, path), len(visited), len(path), sum(map(lambda p: p.weight, path))
+def _run(algorithm, app_scene, cube, paths, snapshot=True, view=SearchView,
+         **options):
+    """Searches the current terrain and walks the path found.
 
-        for neighbor in paths.get_neighbors(current_node):
-            tentative_gscore = g_score[current_node] + current_node.weight
+    Args:
+        algorithm: Key of solvers.STEPPERS.
 
-            if tentative_gscore < g_score[neighbor] and not neighbor.is_blocked:
-                # This path is better. Record It !
-                came_from[neighbor] = current_node
-                g_score[neighbor] = tentative_gscore
-                f_score[neighbor] = g_score[neighbor] + heuristic(
-                    neighbor, paths.get_objective())
+        snapshot: Whether to search a copy of the terrain, since the user
+                  may keep editing it during the search. Solvers following
+                  the edits themselves search the terrain shown.
 
-                open_queue.put((f_score[neighbor], neighbor))
-                neighbor.rect_color = (180, 0, 0)
+        view: SearchView class painting the search.
 
-        current_node.rect_color = (255, 0, 255)
-        visited.add(current_node)
-        time.sleep(TIME_INTERVAL)
+        options: Extra keyword arguments given to the solver.
+    """
+
+    terrain = paths.to_grid() if snapshot else paths.grid
+    start = paths.get_index(cube.get_pos())
 
-    # print this if the path just dont exist. :(
-    print("The path doesn't exist")
-    return False, len(visited), 0, 0
+    result = yield from path_cache.steps(terrain, start, terrain.goal,
+                                         algorithm,
+                                         observer=view(paths),
+                                         **options)
 
+    if not result.found:
+        if result.exhausted:
+            print("The search ran out of its budget before finding a path")
+        else:
+            # print this if the path just dont exist. :(
+            print("The path doesn't exist")
+        return False, result.expanded, 0, 0, None
 
-def _search(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList, container_class):
-    """General function for searching."""
-    start_node = paths.find_path(cube)
-    came_from = {}
+    # The character is already on the first cell of the path.
+    to_walk = [paths[cell] for cell in result.path[1:]]
+    yield from walk(cube, to_walk)
+    bound = None if result.bound == 1 else result.bound
+    return True, result.expanded, len(to_walk), result.cost, bound
 
-    queue = container_class()
-    visited = set()
-    queue.put(start_node)
 
-    start_node.rect_colour = (255, 0, 255)
+def astar(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
+    """A* Algorithm. Produces the most optimal path.
 
-    while not queue.empty():
-        current_node = queue.get()
+    Args:
+        app_scene: scene running the search
 
-        if not app_scene.traversing:
-            break
+        cube: Character cube object that will go through the most optimal path.
 
-        if current_node.is_objective:
-            path = reconstruct_path(came_from, current_node)
-            return (walk(app_scene, cube, path), len(visited), len(path),
-                    sum(map(lambda p: p.weight, path)))
-        elif current_node in visited:
-            continue
+        paths: PathCubeList object.
 
-        for neighbour in paths.get_neighbors(current_node):
-            if not (neighbour.is_blocked or neighbour in visited):
-                queue.put(neighbour)
-                came_from[neighbour] = current_node
-                neighbour.rect_color = (180, 0, 0)
+    Returns:
+        Generator for an Animation object, returning a tuple (found,
+        visited, path_len, path_cost, bound).
+    """
 
-        visited.add(current_node)
-        current_node.rect_color = (255, 0, 255)
-        time.sleep(TIME_INTERVAL)
-    return False, len(visited), 0, 0
+    return _run("astar", app_scene, cube, paths)
 
 
-def dfs(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList) -> bool:
+def weighted_astar(app_scene, cube: cubes.CharacterCube,
+                   paths: cubes.PathCubeList):
+    """Weighted A*. Expands fewer cells than A*, for a path costing at most
+    WEIGHTED_EPSILON times the cheapest.
+    """
+
+    return _run("weighted_astar", app_scene, cube, paths,
+                epsilon=WEIGHTED_EPSILON)
+
+
+def ara_star(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
+    """ARA*. Finds a path quickly, then searches again, with a heuristic
+    weighing less each time, until the path is the cheapest. Each search
+    reuses the cells the previous ones expanded, and each path found is
+    painted until a cheaper one replaces it.
+
+    After ARA_MAX_EXPANDED cells, the cube walks the best path found so far,
+    and the returned tuple's bound tells how far from the cheapest it may be.
+    """
+
+    return _run("ara_star", app_scene, cube, paths, view=AnytimeView,
+                epsilon=ARA_EPSILON,
+                budget=Budget(max_expanded=ARA_MAX_EXPANDED))
+
+
+def dfs(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
     """Finds a path from the starting node to the end node.
 
     The start node is defined by the current cube's position and the
     end node is defined by the pathcube which its is_objective attribute is true.
 
     The algorithm finds a path using the depth-first search algorithm.
-
-    Returns:
-        True if the a path was found, othewise False.
     """
 
-    return _search(app_scene, cube, paths, LifoQueue)
+    return _run("dfs", app_scene, cube, paths)
 
 
 def bfs(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
     """Breadth-first search algorithm."""
 
-    return _search(app_scene, cube, paths, Queue)
+    return _run("bfs", app_scene, cube, paths)
 
 
 def dijkstra(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
-    initial_node = paths.find_path(cube)
-    distances = {node: float("inf") for node in paths}
-    distances[initial_node] = 0
-
-    came_from = {initial_node: None}
-    visited = set()
-
-    priority_queue = PriorityQueue()
-    priority_queue.put((0, initial_node))
-
-    while not priority_queue.empty():
-        if not app_scene.traversing:
-            return False
-        current_distance, current_node = priority_queue.get()
-
-        if current_node.is_objective:
-            found_path = reconstruct_path(came_from, current_node)
-            found_path.pop(0)
-            return walk(app_scene, cube, found_path), len(visited), len(found_path), sum(map(lambda p: p.weight, found_path))
-        elif current_node in visited:
-            continue
-
-        for neighbour in paths.get_neighbors(current_node):
-            if neighbour.is_blocked:
-                continue
+    """Dijkstra's algorithm."""
+
+    return _run("dijkstra", app_scene, cube, paths)
+
+
+def jps(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
+    """Jump Point Search. Finds paths as cheap as A*'s while expanding only
+    the cells where the path may turn.
+    """
+
+    return _run("jps", app_scene, cube, paths)
 
-            tentative_distance = distances[current_node] + neighbour.weight
 
-            if tentative_distance < distances[neighbour]:
-                distances[neighbour] = tentative_distance
-                came_from[neighbour] = current_node
-                if neighbour not in visited:
-                    priority_queue.put((tentative_distance, neighbour))
-                    neighbour.rect_color = (180, 0, 0)
-        
-        visited.add(current_node)
-        current_node.rect_color = (255, 0, 255)
-        time.sleep(TIME_INTERVAL)
+def bidirectional_astar(app_scene, cube: cubes.CharacterCube,
+                        paths: cubes.PathCubeList):
+    """A* searching from the cube and from the objective at once."""
+
+    return _run("bidirectional_astar", app_scene, cube, paths)
+
+
+def bidirectional_dijkstra(app_scene, cube: cubes.CharacterCube,
+                           paths: cubes.PathCubeList):
+    """Dijkstra's algorithm searching from the cube and from the objective at
+    once.
+    """
+
+    return _run("bidirectional_dijkstra", app_scene, cube, paths)
+
+
+def hpa(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
+    """Hierarchical A*. Searches a graph of the crossings between clusters
+    of cells, which is kept between searches and only computed again around
+    the cells edited since the last one.
+    """
+
+    if paths.clusters is None:
+        paths.clusters = hierarchical.ClusterGraph(paths.grid)
+        paths.grid.listeners.append(paths.clusters.update_cell)
+
+    # The cluster graph follows the edits of the terrain shown, and starts
+    # its search over when the user edits it meanwhile
+    return _run("hpa", app_scene, cube, paths, snapshot=False,
+                clusters=paths.clusters)
+
+
+def dstar_lite(app_scene, cube: cubes.CharacterCube, paths: cubes.PathCubeList):
+    """D* Lite. The cube starts walking along the path found and, whenever
+    the user edits the terrain on the way, only the affected part of the
+    search is repaired before taking the next step.
+
+    The returned tuple's visited adds up the cells expanded by every
+    replanning.
+    """
+
+    terrain = paths.grid
+    goal = terrain.goal
+    changed = []
+    listener = changed.append
+    terrain.listeners.append(listener)
+
+    try:
+        planner = incremental.DStarLite(terrain, paths.get_index(cube.get_pos()),
+                                        goal, SearchView(paths))
+        result = yield from planner.plan_steps()
+        expanded = result.expanded
+        walked = cost = 0
+
+        while result.found and planner.start != goal:
+            if changed:
+                cells, changed[:] = changed[:], []
+                if None in cells or terrain.goal != goal:
+                    # The whole terrain was reset or the objective moved
+                    return False, expanded, walked, cost, None
+                for cell in cells:
+                    planner.update_cell(cell)
+                result = yield from planner.plan_steps()
+                expanded += result.expanded
+                continue
 
-    return False, len(visited), 0, 0
+            step = result.path[1]
+            paths[step].state = grid.PATH
+            cube.move(paths[step])
+            planner.move_to(step)
+            result.path = result.path[1:]
+            walked += 1
+            cost += terrain.weights[step]
+            yield WALK_INTERVAL
+    finally:
+        terrain.listeners.remove(listener)
+
+    if not result.found:
+        print("The path doesn't exist")
+    return result.found, expanded, walked, cost, None
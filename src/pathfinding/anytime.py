@@ -0,0 +1,238 @@
+"""anytime.py module
+
+ARA*, an anytime search. It finds a first path quickly with an inflated
+heuristic, then improves it while time allows, reusing the work of the
+previous searches, until the path is the cheapest.
+"""
+
+from dataclasses import replace
+
+from .heaps import IndexedHeap
+from .results import (SearchResult, exhausted, path_cost, reconstruct_path,
+                      run)
+
+INFINITY = float("inf")
+
+
+class ARAStar:
+    """ARA* search (Likhachev, Gordon and Thrun) over a grid.Grid object.
+
+    Each improvement is a weighted A* search with the heuristic multiplied by
+    epsilon, which decreases down to 1 after every improvement. Cells whose
+    cost goes down after they were expanded aren't expanded again during the
+    same improvement, but queued again for the next one.
+
+    Attributes:
+        epsilon: Factor of the heuristic of the next improvement.
+
+        bound: Factor by which the cost of result is at most the cost of the
+               cheapest path. It can be lower than the epsilon the path was
+               found with.
+
+        result: SearchResult object of the best path found so far, or None.
+
+        expanded: Number of cells expanded by all the improvements.
+
+        finished: Whether result is the cheapest path, or no path exists.
+    """
+
+    def __init__(self, grid, start, goal, observer=None, epsilon=3.0,
+                 decrease=0.5):
+        """Initialise the object.
+
+        Args:
+            grid: grid.Grid object. It mustn't change during the search.
+
+            start: Index of the cell where the search begins.
+
+            goal: Index of the cell to reach.
+
+            observer: Optional events.Observer object told about the
+                      progress of every improvement, including each path
+                      found.
+
+            epsilon: Factor of the heuristic of the first improvement, at
+                     least 1.
+
+            decrease: How much epsilon decreases after each improvement.
+
+        Raises:
+            ValueError: If epsilon is less than 1 or decrease isn't
+                        positive.
+        """
+
+        if epsilon < 1:
+            raise ValueError("epsilon must be at least 1")
+        if decrease <= 0:
+            raise ValueError("decrease must be positive")
+
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.observer = observer
+        self.epsilon = epsilon
+        self.decrease = decrease
+        self.bound = INFINITY
+        self.result = None
+        self.expanded = 0
+        self.finished = False
+
+        self._g = {start: 0}
+        self._came_from = {}
+        self._closed = set()
+        self._inconsistent = set()
+        self._closest, self._closest_h = start, INFINITY
+        self._open_set = IndexedHeap()
+        self._open_set.push(start, self._key(start))
+        if observer is not None:
+            observer.open_set(self._open_set)
+            observer.push(start, 0)
+
+    def steps(self, budget=None):
+        """Improves the path until it's the cheapest or the budget runs out.
+        Calling it again afterwards carries on where it stopped.
+
+        Args:
+            budget: Optional budgets.Budget object limiting the search.
+
+        Returns:
+            Generator yielding None after each cell expanded and returning a
+            SearchResult object. When the budget runs out after a path was
+            found, it's that path, with found and exhausted both set.
+        """
+
+        deadline = None if budget is None else budget.deadline()
+        while not self.finished:
+            for _ in self.improve_steps():
+                if budget is not None and budget.exhausted(
+                        deadline, self.expanded, len(self._g)):
+                    if self.result is None:
+                        return exhausted(self.grid, reconstruct_path(
+                            self._came_from, self._closest), self.expanded)
+                    return replace(self.result, path=list(self.result.path),
+                                   expanded=self.expanded, exhausted=True,
+                                   bound=self.bound)
+                yield
+
+        if self.result is None:
+            return SearchResult(False, expanded=self.expanded)
+        return replace(self.result, path=list(self.result.path),
+                       expanded=self.expanded, bound=self.bound)
+
+    def improve_steps(self):
+        """Runs one improvement, with the current epsilon, yielding after
+        each cell expanded.
+        """
+
+        grid = self.grid
+        goal = self.goal
+        observer = self.observer
+        weights = grid.weights
+        g_score = self._g
+        came_from = self._came_from
+        open_set = self._open_set
+
+        while open_set and g_score.get(goal, INFINITY) > open_set.peek()[0][0]:
+            (_, h), current = open_set.pop()
+            if observer is not None:
+                observer.pop(current)
+            self._closed.add(current)
+            self.expanded += 1
+            if h < self._closest_h:
+                self._closest, self._closest_h = current, h
+
+            current_g = g_score[current]
+            for neighbour in grid.neighbours(current):
+                tentative_g = current_g + weights[neighbour]
+                if tentative_g < g_score.get(neighbour, INFINITY):
+                    if observer is not None:
+                        if neighbour in g_score:
+                            observer.relax(neighbour, tentative_g)
+                        else:
+                            observer.push(neighbour, tentative_g)
+                    g_score[neighbour] = tentative_g
+                    came_from[neighbour] = current
+                    if neighbour in self._closed:
+                        self._inconsistent.add(neighbour)
+                    else:
+                        open_set.push(neighbour, self._key(neighbour))
+
+            if observer is not None:
+                observer.close(current)
+            yield
+
+        self._improved()
+
+    def _improved(self):
+        """Keeps the path found by an improvement and prepares the next."""
+
+        goal_g = self._g.get(self.goal, INFINITY)
+        if goal_g == INFINITY:
+            # Every cell reachable was expanded
+            self.finished = True
+            return
+
+        # Cells on the path may have got cheaper than their successors know,
+        # so the path can cost less than goal_g
+        path = reconstruct_path(self._came_from, self.goal)
+        cost = path_cost(self.grid, path)
+        if self.result is None or cost < self.result.cost:
+            self.result = SearchResult(True, path, self.expanded, cost)
+            if self.observer is not None:
+                self.observer.path_found(path, cost)
+
+        # No path can cost less than the lowest g + h of the cells whose
+        # neighbours may still get cheaper
+        cost = self.result.cost
+        manhattan = self.grid.manhattan
+        lowest = min((self._g[cell] + manhattan(cell, self.goal)
+                      for cells in (self._open_set, self._inconsistent)
+                      for cell in cells), default=INFINITY)
+        if lowest >= cost:
+            self.bound = 1
+        else:
+            self.bound = min(self.bound, self.epsilon, cost / lowest)
+        if self.bound <= 1 or self.epsilon <= 1:
+            self.bound = 1
+            self.finished = True
+            return
+
+        self.epsilon = max(self.epsilon - self.decrease, 1)
+        queued = set(self._open_set) | self._inconsistent
+        self._open_set = IndexedHeap()
+        for cell in queued:
+            self._open_set.push(cell, self._key(cell))
+        if self.observer is not None:
+            self.observer.open_set(self._open_set)
+        self._closed.clear()
+        self._inconsistent.clear()
+
+    def _key(self, cell):
+        h = self.grid.manhattan(cell, self.goal)
+        return self._g[cell] + self.epsilon * h, h
+
+
+def ara_star(grid, start, goal, observer=None, epsilon=3.0, decrease=0.5,
+             budget=None):
+    """ARA*. Takes the same arguments as solvers.astar, and those of
+    ARAStar.
+
+    Without a budget, it goes on until the path is the cheapest, expanding
+    more cells than astar would. Given a time limit, it returns the best
+    path found by then, with the bound proved on its cost. Keep an ARAStar
+    object to read its path and bound between steps.
+
+    Returns:
+        SearchResult object.
+    """
+
+    return run(ara_star_steps(grid, start, goal, observer, epsilon, decrease,
+                              budget))
+
+
+def ara_star_steps(grid, start, goal, observer=None, epsilon=3.0,
+                   decrease=0.5, budget=None):
+    """Stepper of ara_star."""
+
+    return ARAStar(grid, start, goal, observer, epsilon,
+                   decrease).steps(budget)
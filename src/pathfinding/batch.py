@@ -0,0 +1,141 @@
+"""batch.py module
+
+Answers many queries on the same grid with a pool of processes, which,
+unlike threads, search in parallel.
+
+The blocked flags and weights of the grid are copied once into shared
+memory. Each worker process attaches to that memory when it starts and
+searches it directly, so only the queries and their results are sent
+between processes.
+"""
+
+import functools
+import multiprocessing
+from multiprocessing import shared_memory
+
+from . import solvers
+from .grid import Grid
+
+# Shared memory and grid of the current worker process, set by _attach.
+_worker_memory = None
+_worker_grid = None
+
+
+def _attach(name, width, height):
+    """Pool initializer making the shared grid available to a worker."""
+
+    global _worker_memory, _worker_grid
+    _worker_memory = shared_memory.SharedMemory(name)
+    size = width * height
+    grid = Grid(width, height)
+    grid.blocked = _worker_memory.buf[:size]
+    grid.weights = _worker_memory.buf[size:2 * size]
+    _worker_grid = grid
+
+
+def _solve(algorithm, options, version, query):
+    index, (start, goal) = query
+    # The shared memory holds the cells of that version of the grid, so
+    # what the worker's grid caches by version stays right
+    _worker_grid.version = version
+    return index, solvers.solve(_worker_grid, start, goal, algorithm,
+                                **options)
+
+
+class BatchSolver:
+    """Pool of worker processes sharing the memory of a grid.
+
+    Use it as a context manager, or call close when done, so the processes
+    stop and the shared memory is freed:
+
+        with BatchSolver(grid) as batch:
+            for index, result in batch.solve(queries):
+                ...
+    """
+
+    def __init__(self, grid, processes=None):
+        """Initialise the object.
+
+        Args:
+            grid: grid.Grid object to search on. Edits made to it later are
+                  only seen by the workers after calling sync.
+
+            processes: Number of worker processes. Defaults to the number
+                       of CPUs.
+        """
+
+        self.grid = grid
+        size = len(grid)
+        self._memory = shared_memory.SharedMemory(create=True,
+                                                  size=max(2 * size, 1))
+        self.sync()
+        self._pool = multiprocessing.Pool(
+            processes, _attach, (self._memory.name, grid.width, grid.height))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def sync(self):
+        """Copies the grid into the shared memory again after editing it.
+
+        Must not be called while a batch is running.
+        """
+
+        size = len(self.grid)
+        self._memory.buf[:size] = self.grid.blocked
+        self._memory.buf[size:2 * size] = self.grid.weights
+        self._version = self.grid.version
+
+    def solve(self, queries, algorithm="astar", chunksize=16, **options):
+        """Searches paths for all the given queries in the worker processes.
+
+        Args:
+            queries: Iterable of (start, goal) tuples of cell indexes.
+
+            algorithm: Key of solvers.ALGORITHMS.
+
+            chunksize: Number of queries sent to a worker at once. Larger
+                       chunks cost less to send, smaller ones spread the
+                       work more evenly.
+
+            options: Extra keyword arguments given to the algorithm. They
+                     must be picklable.
+
+        Yields:
+            A tuple (index, result) as soon as each query is answered, where
+            index is the position of the query in queries and result a
+            SearchResult object. They don't come in the order of queries.
+        """
+
+        if algorithm not in solvers.ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm!r}")
+        solve = functools.partial(_solve, algorithm, options, self._version)
+        yield from self._pool.imap_unordered(solve, enumerate(queries),
+                                             chunksize)
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory."""
+
+        self._pool.terminate()
+        self._pool.join()
+        self._memory.close()
+        self._memory.unlink()
+
+
+def solve_all(grid, queries, algorithm="astar", processes=None, **options):
+    """Answers queries on grid in parallel. See BatchSolver.solve.
+
+    Returns:
+        list object with the SearchResult of each query, in the order of
+        queries.
+    """
+
+    queries = list(queries)
+    results = [None] * len(queries)
+    with BatchSolver(grid, processes) as batch:
+        for index, result in batch.solve(queries, algorithm, **options):
+            results[index] = result
+    return results
@@ -0,0 +1,264 @@
+"""benchmark.py module
+
+Reproducible benchmarks of the headless solvers.
+
+Every case is a grid generated from a fixed seed, for each combination of
+size, obstacle density and weight distribution, searched by every algorithm
+between the same pairs of cells. Results can be saved as a JSON baseline and
+later runs compared with it to catch regressions:
+
+    python -m pathfinding.benchmark --output baseline.json
+    python -m pathfinding.benchmark --baseline baseline.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from . import solvers
+from .grid import Grid
+
+SIZES = (32, 64, 128)
+# 0.3 is what the application blocks when generating a maze
+DENSITIES = (0.0, 0.1, 0.3)
+WEIGHTS = {
+    "uniform": (1,),
+    "app": (1, 2, 3),
+    "wide": tuple(range(1, 17)),
+}
+QUERIES = 5
+# Timings are the best of this many runs, which filters out most noise
+REPEAT = 3
+SEED = 0
+
+
+def make_case(size, density, weights, seed=SEED, queries=QUERIES):
+    """Generates the grid and queries of a benchmark case.
+
+    Args:
+        size: Number of columns and rows.
+
+        density: Fraction of the cells blocked.
+
+        weights: Key of WEIGHTS.
+
+        seed: Seed of the random generator.
+
+        queries: Number of (start, goal) pairs.
+
+    Returns:
+        A tuple (grid, queries), where queries lists (start, goal) tuples of
+        open cells.
+    """
+
+    rng = random.Random(f"{seed}-{size}-{density}-{weights}")
+    cells = size * size
+    blocked = bytearray(cells)
+    for cell in rng.sample(range(cells), int(cells * density)):
+        blocked[cell] = 1
+    grid = Grid(size, size, blocked,
+                [rng.choice(WEIGHTS[weights]) for _ in range(cells)])
+
+    open_cells = [cell for cell in range(cells) if not blocked[cell]]
+    pairs = [tuple(rng.sample(open_cells, 2)) for _ in range(queries)]
+    return grid, pairs
+
+
+def run_case(grid, queries, algorithm, optimal_costs, memory=True,
+             repeat=REPEAT):
+    """Times an algorithm on every query of a case.
+
+    With memory, the queries are searched twice: once for timing, and once
+    with tracemalloc running, which slows Python down, for the peak memory.
+
+    Returns:
+        dict object with the measurements.
+    """
+
+    solver = solvers.ALGORITHMS[algorithm]
+    seconds = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [solver(grid, start, goal) for start, goal in queries]
+        seconds = min(seconds, time.perf_counter() - started)
+
+    peak = 0
+    for start, goal in queries if memory else ():
+        tracemalloc.start()
+        solver(grid, start, goal)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    found = [(result, optimal) for result, optimal in zip(results,
+                                                          optimal_costs)
+             if result.found]
+    expanded = sum(result.expanded for result in results)
+    cost = sum(result.cost for result, _ in found)
+    optimal_cost = sum(optimal for _, optimal in found)
+    return {
+        "found": len(found),
+        "seconds": seconds,
+        "expanded": expanded,
+        "expansions_per_second": expanded / seconds if seconds else None,
+        "peak_bytes": peak if memory else None,
+        "cost": cost,
+        "optimal_cost": optimal_cost,
+        "cost_ratio": cost / optimal_cost if optimal_cost else 1.0,
+    }
+
+
+def run(algorithms=None, sizes=SIZES, densities=DENSITIES,
+        weights=tuple(WEIGHTS), seed=SEED, queries=QUERIES, memory=True,
+        repeat=REPEAT, progress=None):
+    """Runs the whole benchmark matrix.
+
+    Args:
+        algorithms: Keys of solvers.ALGORITHMS. Defaults to all of them.
+
+        sizes, densities, weights: Values of the matrix to cover.
+
+        seed: Seed of the grids and queries.
+
+        queries: Number of queries per case.
+
+        memory: Whether to measure the peak memory too.
+
+        repeat: Number of timed runs of each case.
+
+        progress: Optional callable invoked with each record as it's made.
+
+    Returns:
+        dict object with the environment and a list of records, one per
+        algorithm and case.
+    """
+
+    if algorithms is None:
+        algorithms = list(solvers.ALGORITHMS)
+    records = []
+    for size in sizes:
+        for density in densities:
+            for weight_name in weights:
+                grid, pairs = make_case(size, density, weight_name, seed,
+                                        queries)
+                optimal_costs = [solvers.dijkstra(grid, start, goal).cost
+                                 for start, goal in pairs]
+                for algorithm in algorithms:
+                    record = {"algorithm": algorithm, "size": size,
+                              "density": density, "weights": weight_name}
+                    record.update(run_case(grid, pairs, algorithm,
+                                           optimal_costs, memory, repeat))
+                    records.append(record)
+                    if progress is not None:
+                        progress(record)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "queries": queries,
+        "repeat": repeat,
+        "results": records,
+    }
+
+
+def compare(baseline, current, tolerance=0.25):
+    """Finds the regressions of a run against a baseline.
+
+    Args:
+        baseline: dict object returned by run, or loaded from its JSON.
+
+        current: dict object returned by run.
+
+        tolerance: Fraction by which the time may grow before it counts as a
+                   regression. Expansions and costs must not grow at all.
+
+    Returns:
+        list object with a message for each regression.
+    """
+
+    def key(record):
+        return (record["algorithm"], record["size"], record["density"],
+                record["weights"])
+
+    previous = {key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = previous.get(key(record))
+        if old is None:
+            continue
+        case = "{} {}x{} density={} weights={}".format(
+            record["algorithm"], record["size"], record["size"],
+            record["density"], record["weights"])
+        if record["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(f"{case}: {old['seconds']:.4f}s -> "
+                               f"{record['seconds']:.4f}s")
+        for measure in ("expanded", "cost_ratio", "peak_bytes"):
+            if record[measure] is None or old[measure] is None:
+                continue
+            limit = old[measure] * (1 + tolerance if measure == "peak_bytes"
+                                    else 1)
+            if record[measure] > limit + 1e-9:
+                regressions.append(f"{case}: {measure} {old[measure]} -> "
+                                   f"{record[measure]}")
+        if record["found"] != old["found"]:
+            regressions.append(f"{case}: found {old['found']} -> "
+                               f"{record['found']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pathfinding.benchmark",
+        description="Benchmark the pathfinding solvers.")
+    parser.add_argument("-a", "--algorithms", nargs="+",
+                        choices=list(solvers.ALGORITHMS),
+                        help="algorithms to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--densities", nargs="+", type=float,
+                        default=DENSITIES)
+    parser.add_argument("--weights", nargs="+", choices=list(WEIGHTS),
+                        default=list(WEIGHTS))
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the slower peak memory measurements")
+    parser.add_argument("-o", "--output", help="save the results as JSON")
+    parser.add_argument("-b", "--baseline",
+                        help="JSON results to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline "
+                             "(default: 0.25)")
+    args = parser.parse_args(argv)
+
+    def progress(record):
+        print("{algorithm:>22} {size:>4} {density:>4} {weights:>7}  "
+              "{seconds:8.4f}s {expanded:>8} exp  {peak:>9} B  "
+              "cost x{cost_ratio:.3f}".format(peak=record["peak_bytes"] or "-",
+                                              **record))
+
+    results = run(args.algorithms, args.sizes, args.densities, args.weights,
+                  args.seed, args.queries, not args.no_memory,
+                  args.repeat, progress)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), results, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
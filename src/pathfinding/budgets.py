@@ -0,0 +1,72 @@
+"""budgets.py module
+
+Limits on the time and memory a search may take.
+
+A search given a Budget checks it before expanding each cell. Once any of
+its limits is reached, the search stops and returns a SearchResult whose
+exhausted attribute is set, found being False, and whose path leads from
+the start to the cell expanded closest to the goal, by manhattan distance.
+Every solver but dstar_lite, which searches from the goal to the start,
+takes a budget option:
+
+    result = solvers.astar(grid, start, goal,
+                           budget=Budget(seconds=0.005))
+    if result.exhausted:
+        ...
+
+What a search does before its first expansion, like building the cluster
+graph of hpa or choosing the open set of astar, counts towards the time
+limit but isn't interrupted.
+"""
+
+import time
+from dataclasses import dataclass
+
+# Bytes taken by each cell a search stores, counting its entries in the
+# search's dicts and open set. Measured on the solvers of this package.
+CELL_BYTES = 200
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Limits on a search. Those left to None don't apply.
+
+    Attributes:
+        seconds: Wall time the search may take, from its first step. With
+                 a stepper, the time between steps counts as well.
+
+        max_expanded: Most cells the search may expand.
+
+        max_memory: Most bytes the search may store, estimated from the
+                    number of cells it stored at CELL_BYTES each.
+    """
+
+    seconds: float = None
+    max_expanded: int = None
+    max_memory: int = None
+
+    def deadline(self):
+        """Gets the time.perf_counter value at which a search starting now
+        runs out of time, or None.
+        """
+
+        if self.seconds is None:
+            return None
+        return time.perf_counter() + self.seconds
+
+    def exhausted(self, deadline, expanded, stored):
+        """Tells whether a search reached any of the limits.
+
+        Args:
+            deadline: Value returned by deadline when the search started.
+
+            expanded: Number of cells the search expanded so far.
+
+            stored: Number of cells the search stored so far.
+        """
+
+        return ((self.max_expanded is not None
+                 and expanded >= self.max_expanded)
+                or (self.max_memory is not None
+                    and stored * CELL_BYTES > self.max_memory)
+                or (deadline is not None and time.perf_counter() >= deadline))
@@ -0,0 +1,114 @@
+"""cache.py module
+
+Cache of search results, so that repeating a query on a grid that didn't
+change since returns at once instead of searching again.
+"""
+
+from collections import OrderedDict
+from dataclasses import replace
+
+from . import solvers
+from .results import run
+
+
+class PathCache:
+    """Least recently used cache of SearchResult objects.
+
+    Results are keyed by algorithm, start, goal, options and the version of
+    the grid searched, which every change made through the grid.Grid methods
+    advances. Results for an older version are never returned and end up
+    evicted as newer ones come in.
+    """
+
+    def __init__(self, maxsize=128):
+        """Initialise the object.
+
+        Args:
+            maxsize: Most results kept at once.
+        """
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """Forgets every result and resets the counters."""
+
+        self._results.clear()
+        self.hits = self.misses = 0
+
+    def solve(self, grid, start, goal, algorithm="astar", observer=None,
+              **options):
+        """Returns the cached result of the search, or searches and caches it.
+
+        Args:
+            grid: grid.Grid object to search on.
+
+            start: Index of the cell where the search begins.
+
+            goal: Index of the cell to reach.
+
+            algorithm: Key of solvers.ALGORITHMS, or a solver function.
+
+            observer: Optional events.Observer object given to the solver.
+                      When the result comes from the cache, it's only told
+                      about the path found.
+
+            options: Extra keyword arguments given to the solver. Searches
+                     with unhashable options, or that ran out of their
+                     budget, aren't cached.
+
+        Returns:
+            SearchResult object, owned by the caller.
+        """
+
+        return run(self.steps(grid, start, goal, algorithm, observer,
+                              **options))
+
+    def steps(self, grid, start, goal, algorithm="astar", observer=None,
+              **options):
+        """Stepper of solve, like the ones of solvers.steps. Results from
+        the cache are returned at the first step, and so are the results of
+        solver functions, which can't be stepped through.
+        """
+
+        try:
+            key = (algorithm, start, goal, grid.version,
+                   frozenset(options.items()))
+            result = self._results.get(key)
+        except TypeError:
+            self.misses += 1
+            return (yield from self._steps(grid, start, goal, algorithm,
+                                           observer, options))
+
+        if result is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+            if observer is not None and result.found:
+                observer.path_found(list(result.path), result.cost)
+            return replace(result, path=list(result.path))
+
+        self.misses += 1
+        result = yield from self._steps(grid, start, goal, algorithm,
+                                        observer, options)
+        if result.exhausted:
+            # Searching again might get further in the time left
+            return result
+        self._results[key] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return replace(result, path=list(result.path))
+
+    @staticmethod
+    def _steps(grid, start, goal, algorithm, observer, options):
+        if callable(algorithm):
+            result = algorithm(grid, start, goal, observer=observer,
+                               **options)
+            yield
+            return result
+        return (yield from solvers.steps(grid, start, goal, algorithm,
+                                         observer=observer, **options))
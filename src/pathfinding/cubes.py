@@ -1,7 +1,10 @@
 """Cubes module."""
 import random
+from collections.abc import Sequence
 
-from pygame import draw, mouse, rect, surface
+from pygame import constants, draw, image, mouse, rect, surface, transform
+
+from . import grid, viewport
 
 SIDE_LENGTH = 20  # In pixels
 
@@ -9,6 +12,8 @@ SIDE_LENGTH = 20  # In pixels
 class Cube:
     """Base class for implementing Cube classes."""
 
+    rect_color = ()
+
     def __init__(self, screen):
         """Initialise the object.
 
@@ -20,7 +25,6 @@ class Cube:
         self.screen = screen
         self.screen_rect = screen.get_rect()
         self.rect = rect.Rect(0, 0, SIDE_LENGTH, SIDE_LENGTH)
-        self.rect_color = ()
         self.pos = self.rect.x, self.rect.y
 
     def draw(self):
@@ -53,8 +57,16 @@ class CharacterCube(Cube):
         self.rect.x = path_obj.rect.x
         self.rect.y = path_obj.rect.y
 
-    def draw(self):
-        draw.rect(self.screen, self.rect_color, self.rect, border_radius=3)
+    def draw(self, area=None):
+        """Draws the cube.
+
+        Args:
+            area: Optional pygame.rect.Rect object where to draw it instead
+                  of its rect.
+        """
+
+        area = self.rect if area is None else area
+        draw.rect(self.screen, self.rect_color, area, border_radius=3)
 
     def reset_pos(self):
         """Resets the cube's position to the topleft of the terrain
@@ -65,15 +77,22 @@ class CharacterCube(Cube):
 
 
 class PathCube(Cube):
-    """Cube subclass working as a path block in the game's surface."""
+    """Cube subclass working as a path block in the game's surface.
 
-    ID = 0
+    The state of the path is stored in a grid.Grid object. PathCube objects
+    are only views of its cells used for drawing them.
+    """
 
     BLOCKED_COLOUR = (10, 140, 138)
     OPEN_COLOUR = (43, 218, 127)
     OBJECTIVE_COLOUR = (255, 225, 45)
+    STATE_COLOURS = {
+        grid.FRONTIER: (180, 0, 0),
+        grid.VISITED: (255, 0, 255),
+        grid.PATH: (255, 165, 0),
+    }
 
-    def __init__(self, screen, pos):
+    def __init__(self, screen, pos, grid_, index):
         """Initialise the object.
 
         Args:
@@ -81,72 +100,164 @@ class PathCube(Cube):
                     drawn on.
 
             pos: tuple containing the x and y coordinates.
+
+            grid_: grid.Grid object holding the state of the path.
+
+            index: Index of the path's cell in grid_.
         """
 
         super().__init__(screen)
-        self.rect_color = self.OPEN_COLOUR
-        self.is_blocked = False
-        self.is_objective = False
-        self.weight = random.randint(1, 3)
-        self.f_cost = 0
+        self.grid = grid_
+        self.index = index
 
         self.rect.x, self.rect.y = pos  # (x, y)
-        self.id = PathCube.ID
 
-        PathCube.ID += 1
+    @property
+    def is_blocked(self):
+        return bool(self.grid.blocked[self.index])
+
+    @property
+    def is_objective(self):
+        return self.grid.goal == self.index
+
+    @property
+    def weight(self):
+        return self.grid.weights[self.index]
+
+    @property
+    def state(self):
+        """Visit state of the path. See the constants in the grid module."""
+
+        return self.grid.state[self.index]
+
+    @state.setter
+    def state(self, value):
+        self.grid.state[self.index] = value
+
+    @property
+    def rect_color(self):
+        if self.is_blocked:
+            return self.BLOCKED_COLOUR
+        if self.is_objective:
+            return self.OBJECTIVE_COLOUR
+        return self.STATE_COLOURS.get(self.state, self.OPEN_COLOUR)
 
     def block(self):
-        """Change the status of the path to blocked and change the color
-        (red).
-        """
+        """Change the status of the path to blocked."""
 
-        self.rect_color = self.BLOCKED_COLOUR
-        self.is_blocked = True
-        self.is_objective = False
+        self.grid.block(self.index)
 
     def unblock(self):
-        """Change the status of the path to unblocked and change the color
-        (green).
-        """
+        """Change the status of the path to unblocked."""
 
-        self.rect_color = self.OPEN_COLOUR
-        self.is_blocked = False
-        self.is_objective = False
+        self.grid.unblock(self.index)
 
     def set_objective(self):
         """Change the status of the path to be the objective from which the
         CharacterCube object will go to in the most optimal way.
         """
 
-        self.rect_color = self.OBJECTIVE_COLOUR
-        self.is_blocked = False
-        self.is_objective = True
+        self.grid.set_objective(self.index)
 
-    def draw(self):
-        draw.rect(self.screen, self.rect_color, self.rect)
-        draw.rect(self.screen, (0, 0, 0), self.rect, 2)
+    def draw(self, target=None, area=None, border=2):
+        """Draws the path.
+
+        Args:
+            target: Optional pygame.surface.Surface object to draw on instead
+                    of the screen.
+
+            area: Optional pygame.rect.Rect object where to draw on target,
+                  instead of the path's rect.
+
+            border: Width in pixels of the outline, or 0 for none.
+        """
+
+        target = self.screen if target is None else target
+        area = self.rect if area is None else area
+        draw.rect(target, self.rect_color, area)
+        # Not drawn with draw.rect, nor filled without clipping the edges
+        # first, as both would outline the part of area inside of target
+        # rather than area itself.
+        bounds = target.get_rect()
+        for edge in ((area.x, area.y, area.width, border),
+                     (area.x, area.bottom - border, area.width, border),
+                     (area.x, area.y, border, area.height),
+                     (area.right - border, area.y, border, area.height)):
+            target.fill((0, 0, 0), bounds.clip(edge))
 
     def __repr__(self):
-        return f"Path({self.id}) at {self.get_pos()}"
+        return f"Path({self.index}) at {self.get_pos()}"
 
-    def __lt__(self, other):
-        """The comparison is based on the f cost."""
+    def __eq__(self, other):
+        # Paths are views, so two of them are the same if they view the
+        # same cell.
+        if not isinstance(other, PathCube):
+            return NotImplemented
+        return self.grid is other.grid and self.index == other.index
 
-        return self.f_cost < other.f_cost
+    def __hash__(self):
+        return hash((id(self.grid), self.index))
 
 
-class PathCubeList(list):
-    """Subclass of list to organise all paths objects and interact with them."""
+class PathCubeList(Sequence):
+    """Sequence of the paths of the grid, to organise them and interact with
+    them. The path objects are made when they're accessed, so that a large
+    grid doesn't hold one for every cell.
+
+    The positions of the paths and of the character cube are those they
+    would have on the screen with the camera reset. The camera decides where
+    they're actually drawn.
+    """
 
     WIDTH_SPACING_FACTOR = 160
     HEIGHT_SPACING_FACTOR = 80
+    MAX_BRUSH_SIZE = 9
+    # Colours of the cells as drawn on the cached surface, indexed by their
+    # state, plus 4 for blocked cells.
+    PALETTE = ((PathCube.OPEN_COLOUR,)
+               + tuple(PathCube.STATE_COLOURS[state]
+                       for state in (grid.FRONTIER, grid.VISITED, grid.PATH))
+               + (PathCube.BLOCKED_COLOUR,) * 4)
+
+    def __init__(self, screen, grid_=None):
+        """Initialise the object.
+
+        Args:
+            screen: pygame.surface.Surface object where the paths are drawn.
+
+            grid_: Optional grid.Grid object to view. Defaults to a new grid
+                   filling the screen, with random weights.
+        """
 
-    def __init__(self, screen, *args, **kwargs):
-        super().__init__(*args, **kwargs)
         self.screen = screen
         self.rect = rect.Rect(0, 0, self.grid_width, self.grid_height)
         self.rect.center = self.screen.get_rect().center
-        self.gen_paths()
+        if grid_ is None:
+            columns = self.grid_width // SIDE_LENGTH
+            rows = self.grid_height // SIDE_LENGTH
+            grid_ = grid.Grid(
+                columns, rows,
+                weights=random.choices((1, 2, 3), k=columns * rows))
+        self.grid = grid_
+        self.n_columns = grid_.width
+        self.n_rows = grid_.height
+        self.camera = viewport.Viewport(self.rect, self.n_columns,
+                                        self.n_rows, SIDE_LENGTH)
+        # hierarchical.ClusterGraph of the grid, built the first time HPA*
+        # runs and then kept up to date with it.
+        self.clusters = None
+
+        # The paths in view are painted once on this surface, then only the
+        # ones that changed. _painted holds what was painted: the camera,
+        # the cells drawn and their arrays, and the objective.
+        self.surface = surface.Surface(self.rect.size, constants.SRCALPHA)
+        self._painted = None
+
+        # Side, in cells, of the square blocked around the pointer.
+        self.brush_size = 1
+        # Column and row under the pointer on the last frame of a stroke, so
+        # the cells skipped by a fast drag are blocked too.
+        self._stroke_end = None
 
     def get_neighbors(self, path_: PathCube):
         """Get the neighbors of the given path.
@@ -158,21 +269,84 @@ class PathCubeList(list):
             A list containing all the path_ neighbors.
         """
 
+        column, row = self.get_coords(path_.get_pos())
         neighbors = []
-        pathx, pathy = path_.get_pos()
-        for path in self:
-            is_neighbor = any(
-                [
-                    path.rect.collidepoint(pathx, pathy - SIDE_LENGTH),
-                    path.rect.collidepoint(pathx, pathy + SIDE_LENGTH),
-                    path.rect.collidepoint(pathx - SIDE_LENGTH, pathy),
-                    path.rect.collidepoint(pathx + SIDE_LENGTH, pathy),
-                ]
-            )
-            if is_neighbor:
-                neighbors.append(path)
+        if row > 0:
+            neighbors.append(self.get_path(column, row - 1))
+        if row < self.n_rows - 1:
+            neighbors.append(self.get_path(column, row + 1))
+        if column > 0:
+            neighbors.append(self.get_path(column - 1, row))
+        if column < self.n_columns - 1:
+            neighbors.append(self.get_path(column + 1, row))
         return neighbors
 
+    def get_coords(self, pos):
+        """Converts a position in pixels to the column and row of the grid.
+
+        Args:
+            pos: tuple containing the x and y coordinates.
+
+        Returns:
+            A tuple (column, row). It might be outside of the grid.
+        """
+
+        x, y = pos
+        return ((x - self.WIDTH_SPACING_FACTOR // 2) // SIDE_LENGTH,
+                (y - self.HEIGHT_SPACING_FACTOR // 2) // SIDE_LENGTH)
+
+    def get_index(self, pos):
+        """Get the index of the path covering the given position.
+
+        Args:
+            pos: tuple containing the x and y coordinates.
+
+        Returns:
+            Index of the path in this list, or None if pos is outside of the
+            grid.
+        """
+
+        return self._to_index(*self.get_coords(pos))
+
+    def get_index_on_screen(self, pos):
+        """Get the index of the path drawn at the given position of the
+        screen with the current camera.
+
+        Args:
+            pos: tuple containing the x and y coordinates.
+
+        Returns:
+            Index of the path in this list, or None if pos isn't over a
+            path in view.
+        """
+
+        if not self.rect.collidepoint(pos):
+            return None
+        return self._to_index(*self.camera.cell_at(pos))
+
+    def _to_index(self, column, row):
+        if 0 <= column < self.n_columns and 0 <= row < self.n_rows:
+            return row * self.n_columns + column
+        return None
+
+    def get_screen_rect(self, cube):
+        """Get where a cube over the grid is drawn with the current camera.
+
+        Returns:
+            pygame.rect.Rect object, clipped to the view, and at least 3
+            pixels wide when the cube is in view, so that it can be seen
+            even zoomed out.
+        """
+
+        area = self.camera.cell_rect(*self.get_coords(cube.get_pos()))
+        area.inflate_ip(max(3 - area.width, 0), max(3 - area.height, 0))
+        return area.clip(self.rect)
+
+    def get_path(self, column, row):
+        """Get the PathCube object at the given column and row."""
+
+        return self[row * self.n_columns + column]
+
     @property
     def grid_width(self):
         return self.screen.get_width() - self.WIDTH_SPACING_FACTOR
@@ -181,59 +355,272 @@ class PathCubeList(list):
     def grid_height(self):
         return self.screen.get_height() - self.HEIGHT_SPACING_FACTOR
 
-    def gen_paths(self):
-        """Creates the path objects according to the screen size."""
+    def __len__(self):
+        return len(self.grid)
+
+    def __getitem__(self, index):
+        """Creates the path object viewing a cell of the grid.
+
+        The paths are ordered row by row, so the path at column x and row y
+        is at index y * n_columns + x, like in grid.Grid.
+        """
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+
+        column, row = index % self.n_columns, index // self.n_columns
+        return PathCube(self.screen,
+                        (self.WIDTH_SPACING_FACTOR // 2 + column * SIDE_LENGTH,
+                         self.HEIGHT_SPACING_FACTOR // 2 + row * SIDE_LENGTH),
+                        self.grid, index)
 
-        n_columns = self.grid_height // SIDE_LENGTH
-        n_rows = self.grid_width // SIDE_LENGTH
+    def to_grid(self):
+        """Creates a snapshot of the grid, so it can be searched while the
+        user keeps editing the paths.
 
-        cur_column = self.HEIGHT_SPACING_FACTOR // 2
-        cur_row = self.WIDTH_SPACING_FACTOR // 2
+        Returns:
+            grid.Grid object where each cell has the same index as its
+            PathCube object in this list.
+        """
+
+        return self.grid.copy()
+
+    def render(self):
+        """Repaints on the cached surface the paths in view that changed since
+        the last call, or all of them if the camera moved.
+
+        Returns:
+            A list with the pygame.rect.Rect objects, in screen coordinates,
+            of the paths repainted.
+        """
+
+        camera = self.camera
+        left, top, right, bottom = window = camera.visible()
+        stride = camera.stride
+        width = self.n_columns
+        blocked, state = self.grid.blocked, self.grid.state
+        # Only the cells drawn are compared, which are as many as the pixels
+        # of the view at most. They're copied, as the arrays may be
+        # memoryview objects.
+        rows = range(top, bottom, stride)
+        current = (camera.key, window,
+                   [bytes(blocked[row * width + left:row * width + right:
+                                  stride]) for row in rows],
+                   [bytes(state[row * width + left:row * width + right:
+                                stride]) for row in rows],
+                   self.grid.goal)
+        painted, self._painted = self._painted, current
+        if (painted is None or painted[:2] != current[:2]
+                or painted[4] != current[4]):
+            self._repaint(*current[1:4])
+            return [self.rect.copy()]
+
+        changed = []
+        for old_rows, new_rows in ((painted[2], current[2]),
+                                   (painted[3], current[3])):
+            for row, old, new in zip(rows, old_rows, new_rows):
+                changed.extend(row * width + left + column * stride
+                               for column in _changed_indexes(old, new))
+        if len(changed) * 4 > len(rows) * len(range(left, right, stride)):
+            # Cheaper to paint everything again than cell by cell
+            self._repaint(*current[1:4])
+            return [self.rect.copy()]
+
+        rects = []
+        border = self._border()
+        for index in set(changed):
+            area = camera.cell_rect(index % width, index // width)
+            self[index].draw(self.surface,
+                             area.move(-self.rect.x, -self.rect.y), border)
+            rects.append(area.clip(self.rect))
+        if rects and self.grid.goal is not None:
+            # Zoomed out, it may overlap the cells just painted
+            rects.append(self._paint_objective())
+        return rects
+
+    def _border(self):
+        """Width of the outline of the paths at the current zoom."""
+
+        scale = self.camera.scale
+        return 2 if scale >= 10 else 1 if scale >= 5 else 0
+
+    def _repaint(self, window, blocked, state):
+        """Paints all the paths in view on the cached surface.
+
+        The cells are turned into an 8 bit image, one pixel per cell drawn,
+        which is then scaled to the zoom, so that it's all done in C.
 
-        for x_pos in range(n_rows):
-            for y_pos in range(n_columns):
-                self.append(PathCube(self.screen, (cur_row, cur_column)))
-                cur_column += SIDE_LENGTH
-            cur_column = self.HEIGHT_SPACING_FACTOR // 2
-            cur_row += SIDE_LENGTH
+        Args:
+            window: Cells in view, as given by Viewport.visible.
+
+            blocked, state: Lists with the parts of the rows of the grid
+                            arrays drawn.
+        """
+
+        self.surface.fill((0, 0, 0, 0))
+        left, top, right, bottom = window
+        if left >= right or top >= bottom:
+            return
+
+        camera = self.camera
+        scale = camera.scale
+        columns, rows = len(blocked[0]), len(blocked)
+        codes = b"".join(_cell_codes(*pair) for pair in zip(blocked, state))
+        cells = image.frombuffer(codes, (columns, rows), "P")
+        cells.set_palette(self.PALETTE)
+        if scale > 1:
+            cells = transform.scale(cells, (columns * scale, rows * scale))
+        corner = camera.cell_rect(left, top).move(-self.rect.x,
+                                                  -self.rect.y).topleft
+        painted = self.surface.blit(cells, corner)
+
+        border = self._border()
+        if border:
+            # The outlines of neighbouring paths, drawn as lines.
+            for column in range(columns + 1):
+                x = corner[0] + column * scale
+                self.surface.fill((0, 0, 0), rect.Rect(
+                    x - border, painted.y, 2 * border,
+                    painted.height).clip(painted))
+            for row in range(rows + 1):
+                y = corner[1] + row * scale
+                self.surface.fill((0, 0, 0), rect.Rect(
+                    painted.x, y - border, painted.width,
+                    2 * border).clip(painted))
+
+        self._paint_objective()
+
+    def _paint_objective(self):
+        """Paints the objective, if any, at least 3 pixels wide so that it
+        can be seen even zoomed out.
+
+        Returns:
+            pygame.rect.Rect object of the screen where it was painted, or
+            None.
+        """
+
+        goal = self.grid.goal
+        if goal is None:
+            return None
+        area = self.camera.cell_rect(goal % self.n_columns,
+                                     goal // self.n_columns)
+        area.inflate_ip(max(3 - area.width, 0), max(3 - area.height, 0))
+        self[goal].draw(self.surface, area.move(-self.rect.x, -self.rect.y),
+                        self._border())
+        return area.clip(self.rect)
 
     def draw(self):
         """Draws the grid onto screen."""
 
-        for path in self:
-            path.draw()
+        self.render()
+        self.screen.blit(self.surface, self.rect)
 
     def update(self):
-        """Update their colours if they're pressed."""
-
-        for path in self:
-            if mouse.get_pressed()[0] and path.rect.collidepoint(mouse.get_pos()):
-                path.block()
-            elif (
-                mouse.get_pressed()[2]
-                and path.rect.collidepoint(mouse.get_pos())
-                and self.get_objective() is None
-            ):
-                path.set_objective()
+        """Update their colours if they're pressed.
+
+        Dragging with the left button blocks every cell on the line between
+        the positions of the pointer on the last and current frames, with
+        the brush centred on each. Only those cells are looked at.
+        """
+
+        pressed = mouse.get_pressed()
+        pos = mouse.get_pos()
+        if not pressed[0] or not self.rect.collidepoint(pos):
+            self._stroke_end = None
+        if not (pressed[0] or pressed[2]) or not self.rect.collidepoint(pos):
+            return
+
+        column, row = self.camera.cell_at(pos)
+        if pressed[0]:
+            start = self._stroke_end or (column, row)
+            self._stroke_end = column, row
+            for x, y in _line(*start, column, row):
+                self.paint(x, y)
+        elif self.grid.goal is None:
+            index = self.get_index_on_screen(pos)
+            if index is not None:
+                self.set_objective(self[index])
+
+    def paint(self, column, row):
+        """Blocks the cells covered by the brush centred on a cell. The
+        parts of the brush outside of the grid are ignored.
+
+        Args:
+            column, row: Coordinates of the cell. They may be outside of the
+                         grid.
+        """
+
+        # Zoomed out, the brush covers as many cells drawn as zoomed in.
+        size = self.brush_size * self.camera.stride
+        reach = (size - 1) // 2
+        left = max(column - reach, 0)
+        right = min(column - reach + size, self.n_columns)
+        top = max(row - reach, 0)
+        bottom = min(row - reach + size, self.n_rows)
+        blocked = self.grid.blocked
+        for y in range(top, bottom):
+            for index in range(y * self.n_columns + left,
+                               y * self.n_columns + right):
+                if not blocked[index]:
+                    self.grid.block(index)
+
+    def resize_brush(self, change):
+        """Grows or shrinks the brush, between 1 and MAX_BRUSH_SIZE cells.
+
+        Args:
+            change: Number of cells to add to the side of the brush.
+        """
+
+        self.brush_size = min(max(self.brush_size + change, 1),
+                              self.MAX_BRUSH_SIZE)
+
+    def block(self, path):
+        """Blocks the given path.
+
+        Args:
+            path: PathCube object in this list.
+        """
+
+        self.grid.block(path.index)
+
+    def unblock(self, path):
+        """Unblocks the given path.
+
+        Args:
+            path: PathCube object in this list.
+        """
+
+        self.grid.unblock(path.index)
+
+    def set_objective(self, path):
+        """Makes the given path the objective. The previous objective, if
+        any, becomes an ordinary path.
+
+        Args:
+            path: PathCube object in this list.
+        """
+
+        self.grid.set_objective(path.index)
 
     def get_objective(self):
         """Get a CubePath object which its is_objective attribute is set to
         True.
 
         Returns:
-            CubePath object that's an objective.
+            CubePath object that's an objective, or None if there's none.
         """
 
-        for path in self:
-            if path.is_objective:
-                return path
-        return None
+        goal = self.grid.goal
+        return None if goal is None else self[goal]
 
     def unblock_all(self):
         """Set all the PathCube(s) status to unblocked."""
 
-        for path in self:
-            path.unblock()
+        self.grid.unblock_all()
 
     def find_path(self, cube):
         """Get the PathCube that's being covered by the given cube.
@@ -246,10 +633,8 @@ class PathCubeList(list):
             isn't the case, None is returned.
         """
 
-        for path in self:
-            if cube.get_pos() == path.get_pos():
-                return path
-        return None
+        index = self.get_index(cube.get_pos())
+        return None if index is None else self[index]
 
     def clean(self):
         """Clean the steps made by the CharacterCube instance on this
@@ -259,9 +644,55 @@ class PathCubeList(list):
         unlocked colour.
         """
 
-        to_clean = filter(
-            lambda path_cube: not (path_cube.is_blocked or path_cube.is_objective),
-            self
-        )
-        for path_cube in to_clean:
-            path_cube.unblock()
+        self.grid.clean()
+
+
+def _line(x0, y0, x1, y1):
+    """Yields the cells of the line between two cells, both included, with
+    Bresenham's algorithm.
+    """
+
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    step_x = 1 if x0 < x1 else -1
+    step_y = 1 if y0 < y1 else -1
+    error = dx + dy
+    while True:
+        yield x0, y0
+        if x0 == x1 and y0 == y1:
+            return
+        double = 2 * error
+        if double >= dy:
+            error += dy
+            x0 += step_x
+        if double <= dx:
+            error += dx
+            y0 += step_y
+
+
+def _cell_codes(blocked, state):
+    """Gets the palette indexes of a row of cells, their state plus 4 for
+    the blocked ones.
+
+    Flags and states fit in their bytes after shifting the flags, so the
+    rows are combined as two big integers, in C.
+    """
+
+    return (int.from_bytes(blocked, "little") << 2
+            | int.from_bytes(state, "little")).to_bytes(len(state), "little")
+
+
+def _changed_indexes(old, new, chunk=512):
+    """Yields the indexes where two bytes objects of the same length differ.
+
+    They're compared chunk by chunk first, which is done in C, so only the
+    chunks holding changes are scanned in Python.
+    """
+
+    if old == new:
+        return
+    for begin in range(0, len(new), chunk):
+        end = begin + chunk
+        if old[begin:end] != new[begin:end]:
+            for index in range(begin, min(end, len(new))):
+                if old[index] != new[index]:
+                    yield index
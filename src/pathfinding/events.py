@@ -0,0 +1,123 @@
+"""events.py module
+
+Observers of the progress of a search.
+
+Every solver takes an optional observer and reports to it, as it happens,
+each cell pushed to the open set, made cheaper while queued (relaxed),
+popped, and closed once its neighbours were looked at, and finally the path
+found. Solvers given no observer skip all of that, so headless searches pay
+nothing for it.
+"""
+
+import struct
+import time
+
+# Kinds of event, as stored by TraceRecorder
+PUSH = 0
+RELAX = 1
+POP = 2
+CLOSE = 3
+PATH_FOUND = 4
+# One cell of the path, following PATH_FOUND in a trace
+_PATH_CELL = 5
+
+_RECORD = struct.Struct("<BIi")
+
+
+class Observer:
+    """Base class of the observers. It ignores every event, so it's also
+    the null sink.
+    """
+
+    def open_set(self, queue):
+        """The search keeps its open set in queue, a heaps.IndexedHeap or
+        heaps.BucketQueue object, which may be read but not changed. Some
+        searches use several.
+        """
+
+    def push(self, cell, g):
+        """cell entered the open set with cost g from the start, or 0 for
+        searches ignoring weights.
+        """
+
+    def relax(self, cell, g):
+        """cell, already in the open set, got the lower cost g."""
+
+    def pop(self, cell):
+        """cell left the open set to be expanded."""
+
+    def close(self, cell):
+        """cell was expanded and all its neighbours were looked at."""
+
+    def path_found(self, path, cost):
+        """The search ended finding path, a list of cells, costing cost."""
+
+
+class TraceRecorder(Observer):
+    """Observer recording the events in a compact binary form, 9 bytes per
+    event, so that a search can be saved and replayed at any speed.
+    """
+
+    def __init__(self, data=b""):
+        """Initialise the object.
+
+        Args:
+            data: Optional bytes of a trace recorded earlier.
+        """
+
+        self.data = bytearray(data)
+
+    def __len__(self):
+        return len(self.data) // _RECORD.size
+
+    def push(self, cell, g):
+        self.data += _RECORD.pack(PUSH, cell, g)
+
+    def relax(self, cell, g):
+        self.data += _RECORD.pack(RELAX, cell, g)
+
+    def pop(self, cell):
+        self.data += _RECORD.pack(POP, cell, 0)
+
+    def close(self, cell):
+        self.data += _RECORD.pack(CLOSE, cell, 0)
+
+    def path_found(self, path, cost):
+        self.data += _RECORD.pack(PATH_FOUND, len(path), cost)
+        for cell in path:
+            self.data += _RECORD.pack(_PATH_CELL, cell, 0)
+
+    def save(self, file_path):
+        with open(file_path, "wb") as file:
+            file.write(self.data)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, "rb") as file:
+            return cls(file.read())
+
+    def replay(self, observer, interval=0):
+        """Sends the recorded events to another observer.
+
+        Args:
+            observer: Observer object.
+
+            interval: Seconds to wait after each event other than a path
+                      cell, or 0 to replay as fast as possible.
+        """
+
+        records = _RECORD.iter_unpack(self.data)
+        for kind, cell, value in records:
+            if kind == PATH_FOUND:
+                path = [next(records)[1] for _ in range(cell)]
+                observer.path_found(path, value)
+            elif kind == PUSH:
+                observer.push(cell, value)
+            elif kind == RELAX:
+                observer.relax(cell, value)
+            elif kind == POP:
+                observer.pop(cell)
+            elif kind == CLOSE:
+                observer.close(cell)
+            if interval:
+                time.sleep(interval)
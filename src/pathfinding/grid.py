@@ -0,0 +1,285 @@
+"""grid.py module
+
+Headless representation of the terrain. It doesn't depend on pygame, so it can
+be used by the solvers outside of the application.
+
+The grid arrays are plain contiguous buffers. When NumPy is installed, Grid.view
+exposes them as two dimensional arrays sharing the same memory, which is how
+bulk operations over large maps should be written.
+"""
+
+from itertools import count
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Visit states, as stored in Grid.state
+UNVISITED = 0
+FRONTIER = 1
+VISITED = 2
+PATH = 3
+
+# Source of Grid.version numbers, shared by every grid so that no two grids
+# with different contents ever have the same version.
+_versions = count(1)
+
+
+class Grid:
+    """Rectangular grid of cells stored in flat, row-major arrays.
+
+    Cells are addressed by their index, ``y * width + x``. Each cell has a
+    blocked flag, a weight, which is the cost of moving onto it, and a visit
+    state used for displaying searches. The objective is kept as the index of
+    its cell in the goal attribute, or None.
+    """
+
+    def __init__(self, width, height, blocked=None, weights=None, goal=None):
+        """Initialise the object.
+
+        Args:
+            width: Number of columns.
+
+            height: Number of rows.
+
+            blocked: Optional sequence with width * height flags. Non-zero
+                     values are blocked cells.
+
+            weights: Optional sequence with width * height weights. Every
+                     cell weighs 1 if it isn't given.
+
+            goal: Optional index of the objective cell.
+        """
+
+        self.width = width
+        self.height = height
+        size = width * height
+
+        self.blocked = bytearray(size) if blocked is None else bytearray(blocked)
+        self.weights = (bytearray(b"\x01" * size) if weights is None
+                        else bytearray(weights))
+
+        self.state = bytearray(size)
+        self.goal = goal
+        # Advanced by every change made through the methods below. Copies
+        # keep the version, since they hold the same cells.
+        self.version = next(_versions)
+        # Callables invoked with the index of each cell changed through the
+        # methods below, or None when every cell may have changed.
+        self.listeners = []
+        # Version and result of the last weight_range scan
+        self._weight_range = None
+
+        if len(self.blocked) != size or len(self.weights) != size:
+            raise ValueError("blocked and weights must have width * height "
+                             "items")
+
+    @classmethod
+    def from_arrays(cls, blocked, weights=None, goal=None):
+        """Creates a grid from two dimensional arrays shaped (height, width).
+
+        Requires NumPy.
+
+        Args:
+            blocked: Array-like of flags. Non-zero values are blocked cells.
+
+            weights: Optional array-like of weights.
+
+            goal: Optional index of the objective cell.
+
+        Returns:
+            Grid object holding a copy of the given arrays.
+        """
+
+        _require_numpy()
+        blocked = numpy.asarray(blocked)
+        if blocked.ndim != 2:
+            raise ValueError("blocked must be a two dimensional array")
+        height, width = blocked.shape
+        if weights is not None:
+            weights = numpy.asarray(weights, dtype=numpy.uint8).ravel()
+        return cls(width, height, (blocked != 0).astype(numpy.uint8).ravel(),
+                   weights, goal)
+
+    def __len__(self):
+        return self.width * self.height
+
+    def copy(self):
+        """Creates an independent copy of the grid, visit states included."""
+
+        new = type(self)(self.width, self.height, self.blocked, self.weights,
+                         self.goal)
+        new.state[:] = self.state
+        new.version = self.version
+        new._weight_range = self._weight_range
+        return new
+
+    def view(self, name):
+        """Get one of the grid arrays as a NumPy array shaped (height, width).
+
+        No data is copied, so changes made through the view apply to the grid.
+        Requires NumPy.
+
+        Args:
+            name: "blocked", "weights" or "state".
+
+        Returns:
+            numpy.ndarray object of uint8.
+        """
+
+        _require_numpy()
+        if name not in ("blocked", "weights", "state"):
+            raise ValueError(f"Unknown grid array: {name!r}")
+        return numpy.frombuffer(getattr(self, name), dtype=numpy.uint8).reshape(
+            self.height, self.width)
+
+    def block(self, index):
+        """Blocks the given cell. It stops being the objective."""
+
+        self.blocked[index] = 1
+        self.state[index] = UNVISITED
+        if self.goal == index:
+            self.goal = None
+        self._notify(index)
+
+    def unblock(self, index):
+        """Unblocks the given cell. It stops being the objective."""
+
+        self.blocked[index] = 0
+        self.state[index] = UNVISITED
+        if self.goal == index:
+            self.goal = None
+        self._notify(index)
+
+    def set_objective(self, index):
+        """Makes the given cell the objective, replacing the previous one."""
+
+        self.blocked[index] = 0
+        self.state[index] = UNVISITED
+        self.goal = index
+        self._notify(index)
+
+    def unblock_all(self):
+        """Unblocks every cell and removes the objective."""
+
+        self.blocked[:] = bytes(len(self.blocked))
+        self.clean()
+        self.goal = None
+        self._notify(None)
+
+    def fill(self, blocked, weights=None):
+        """Replaces the blocked flags of every cell, and their weights if
+        given. The visit states are reset and the objective removed.
+
+        Args:
+            blocked: Sequence with width * height flags.
+
+            weights: Optional sequence with width * height weights.
+        """
+
+        if len(blocked) != len(self) or (weights is not None
+                                         and len(weights) != len(self)):
+            raise ValueError("blocked and weights must have width * height "
+                             "items")
+        self.blocked[:] = blocked
+        if weights is not None:
+            self.weights[:] = weights
+            self._weight_range = None
+        self.clean()
+        self.goal = None
+        self._notify(None)
+
+    def _notify(self, index):
+        self._advance()
+        for listener in self.listeners:
+            listener(index)
+
+    def clean(self):
+        """Resets the visit state of every cell."""
+
+        self.state[:] = bytes(len(self.state))
+        self._advance()
+
+    def _advance(self):
+        """Moves to a new version, keeping the weight range known for the
+        previous one, since only fill changes weights and it forgets it.
+        """
+
+        cached = self._weight_range
+        known = cached is not None and cached[0] == self.version
+        self.version = next(_versions)
+        if known:
+            self._weight_range = (self.version, cached[1])
+
+    def index(self, x, y):
+        """Gets the index of the cell at the given column and row."""
+
+        return y * self.width + x
+
+    def coords(self, index):
+        """Gets a tuple with the column and row of the given cell index."""
+
+        return index % self.width, index // self.width
+
+    def is_blocked(self, index):
+        return bool(self.blocked[index])
+
+    def weight(self, index):
+        return self.weights[index]
+
+    def weight_range(self):
+        """Gets the lightest and heaviest weights of the cells.
+
+        The weights are scanned once, then the range is kept until fill
+        changes them. Changes made to the weights array directly aren't
+        seen.
+
+        Returns:
+            A tuple (lightest, heaviest), or None if the grid has no cells.
+        """
+
+        cached = self._weight_range
+        if cached is None or cached[0] != self.version:
+            weights = self.weights
+            cached = self._weight_range = (
+                self.version,
+                (min(weights), max(weights)) if len(weights) else None)
+        return cached[1]
+
+    def neighbours(self, index):
+        """Get the open orthogonal neighbours of the given cell.
+
+        Args:
+            index: Index of the cell.
+
+        Returns:
+            A list with the indexes of the unblocked neighbours.
+        """
+
+        width = self.width
+        blocked = self.blocked
+        x = index % width
+        result = []
+        if index >= width and not blocked[index - width]:
+            result.append(index - width)
+        if index + width < len(blocked) and not blocked[index + width]:
+            result.append(index + width)
+        if x > 0 and not blocked[index - 1]:
+            result.append(index - 1)
+        if x < width - 1 and not blocked[index + 1]:
+            result.append(index + 1)
+        return result
+
+    def manhattan(self, index, other):
+        """Manhattan distance, in cells, between two cell indexes."""
+
+        width = self.width
+        return (abs(index % width - other % width)
+                + abs(index // width - other // width))
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("NumPy is required for this operation. Install it "
+                          "with 'pip install numpy'.")
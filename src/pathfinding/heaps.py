@@ -0,0 +1,292 @@
+"""heaps.py module
+
+Priority queues used by the solvers. Unlike queue.PriorityQueue they take no
+locks, since a search never shares its queue between threads.
+"""
+
+import heapq
+
+
+class IndexedHeap:
+    """Binary min-heap where each item has a single priority that can be
+    decreased.
+
+    The position of every queued item in the heap is indexed, so pushing an
+    item that is already queued moves its entry up in place when it lowers
+    its priority, and the heap never holds more entries than items queued.
+    Entries are ordered by (priority, item), so equal priorities are always
+    popped in the same order.
+
+    Attributes:
+        stale_pops: Always 0, as no entry is ever left outdated. It's kept
+                    for the interface shared with BucketQueue.
+    """
+
+    def __init__(self):
+        # (priority, item) entries, and the index of each item's entry
+        self._heap = []
+        self._position = {}
+        self.stale_pops = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __contains__(self, item):
+        return item in self._position
+
+    def __iter__(self):
+        """Iterates over the queued items, in no particular order."""
+
+        return iter(self._position)
+
+    def priority(self, item):
+        """Gets the priority of a queued item."""
+
+        return self._heap[self._position[item]][0]
+
+    def push(self, item, priority):
+        """Queues item, or lowers its priority if it's already queued.
+
+        Args:
+            item: Hashable and comparable object.
+
+            priority: Comparable priority. Lower values are popped first.
+
+        Returns:
+            True if the item was added or its priority decreased, False if it
+            was already queued with a priority at least as low.
+        """
+
+        heap = self._heap
+        position = self._position.get(item)
+        if position is None:
+            heap.append((priority, item))
+            self._sift_up(len(heap) - 1)
+            return True
+        if not priority < heap[position][0]:
+            return False
+        heap[position] = (priority, item)
+        self._sift_up(position)
+        return True
+
+    def update(self, item, priority):
+        """Queues item with the given priority, even if it's higher than the
+        one it had.
+        """
+
+        heap = self._heap
+        position = self._position.get(item)
+        if position is None:
+            heap.append((priority, item))
+            self._sift_up(len(heap) - 1)
+            return
+        entry = heap[position]
+        heap[position] = (priority, item)
+        if (priority, item) < entry:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def remove(self, item):
+        """Removes a queued item.
+
+        Raises:
+            KeyError: The item isn't queued.
+        """
+
+        heap = self._heap
+        position = self._position.pop(item)
+        last = heap.pop()
+        if position == len(heap):
+            return
+        entry = heap[position]
+        heap[position] = last
+        if last < entry:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def pop(self):
+        """Removes the item with the lowest priority.
+
+        Returns:
+            A tuple (priority, item).
+
+        Raises:
+            IndexError: The heap is empty.
+        """
+
+        heap = self._heap
+        last = heap.pop()
+        if not heap:
+            del self._position[last[1]]
+            return last
+        first = heap[0]
+        del self._position[first[1]]
+        heap[0] = last
+        self._sift_down(0)
+        return first
+
+    def peek(self):
+        """Gets the (priority, item) tuple that pop would return."""
+
+        return self._heap[0]
+
+    def _sift_up(self, position):
+        """Moves the entry at position up until its parent isn't greater."""
+
+        heap = self._heap
+        positions = self._position
+        entry = heap[position]
+        while position:
+            parent = (position - 1) >> 1
+            parent_entry = heap[parent]
+            if not entry < parent_entry:
+                break
+            heap[position] = parent_entry
+            positions[parent_entry[1]] = position
+            position = parent
+        heap[position] = entry
+        positions[entry[1]] = position
+
+    def _sift_down(self, position):
+        """Moves the entry at position down until no child is smaller."""
+
+        heap = self._heap
+        positions = self._position
+        end = len(heap)
+        entry = heap[position]
+        child = 2 * position + 1
+        while child < end:
+            right = child + 1
+            if right < end and heap[right] < heap[child]:
+                child = right
+            child_entry = heap[child]
+            if not child_entry < entry:
+                break
+            heap[position] = child_entry
+            positions[child_entry[1]] = position
+            position = child
+            child = 2 * position + 1
+        heap[position] = entry
+        positions[entry[1]] = position
+
+
+class BucketQueue:
+    """Dial's bucket queue for priorities whose first element is a small
+    non-negative integer, like the (f, h) priorities of A*.
+
+    It has the same interface and pop order as IndexedHeap: entries are
+    popped by (priority, item), so ties on f prefer lower h. Priorities are
+    spread over buckets by their first element, which costs O(1) amortized,
+    and each bucket is a binary heap of the entries sharing it, which stay
+    few. It relies on two properties of A* with a consistent heuristic and of
+    Dijkstra's algorithm: popped priorities never decrease, and every queued
+    priority is at most span above the last one popped.
+
+    Decreasing a priority leaves the old entry behind in its bucket. Those
+    stale entries are skipped when popped and counted in stale_pops.
+
+    The first priority pushed sets where the range of priorities starts.
+    """
+
+    def __init__(self, span):
+        """Initialise the object.
+
+        Args:
+            span: Largest difference between the first element of a queued
+                  priority and that of the last item popped.
+        """
+
+        self.span = span
+        self._buckets = [[] for _ in range(span + 1)]
+        self._priority = {}
+        self._current = None
+        self.stale_pops = 0
+
+    def __len__(self):
+        return len(self._priority)
+
+    def __bool__(self):
+        return bool(self._priority)
+
+    def __contains__(self, item):
+        return item in self._priority
+
+    def __iter__(self):
+        """Iterates over the queued items, in no particular order."""
+
+        return iter(self._priority)
+
+    def priority(self, item):
+        """Gets the priority of a queued item."""
+
+        return self._priority[item]
+
+    def push(self, item, priority):
+        """Queues item, or lowers its priority if it's already queued.
+
+        Args:
+            item: Hashable and comparable object.
+
+            priority: Tuple whose first element is an int within span of
+                      that of the last priority popped.
+
+        Returns:
+            True if the item was added or its priority decreased, False if it
+            was already queued with a priority at least as low.
+
+        Raises:
+            ValueError: The priority is out of the range the queue covers.
+        """
+
+        priorities = self._priority
+        current = priorities.get(item)
+        if current is not None and not priority < current:
+            return False
+        first = priority[0]
+        if self._current is None:
+            self._current = first
+        elif not self._current <= first <= self._current + self.span:
+            raise ValueError(f"Priority {priority} is out of the range "
+                             f"[{self._current}, {self._current + self.span}]")
+
+        priorities[item] = priority
+        heapq.heappush(self._buckets[first % len(self._buckets)],
+                       (priority, item))
+        return True
+
+    def pop(self):
+        """Removes the item with the lowest priority.
+
+        Returns:
+            A tuple (priority, item).
+
+        Raises:
+            IndexError: The queue is empty.
+        """
+
+        priorities = self._priority
+        if not priorities:
+            raise IndexError("pop from an empty bucket queue")
+
+        buckets = self._buckets
+        while True:
+            bucket = buckets[self._current % len(buckets)]
+            while bucket:
+                priority, item = heapq.heappop(bucket)
+                if priorities.get(item) == priority:
+                    del priorities[item]
+                    return priority, item
+                self.stale_pops += 1
+            self._current += 1
+
+    def peek(self):
+        """Gets the (priority, item) tuple that pop would return."""
+
+        priority, item = self.pop()
+        self.push(item, priority)
+        return priority, item
@@ -0,0 +1,491 @@
+"""hierarchical.py module
+
+Hierarchical pathfinding (HPA*, Botea, Müller and Schaeffer).
+
+The grid is split into square clusters. Wherever two neighbouring clusters
+share a run of open cells along their border, the cells on both sides of one
+or two crossings become nodes of an abstract graph. Each node is linked to
+the nodes of its cluster by the cost of the cheapest path between them
+inside the cluster, and to its counterpart across the border by the cost of
+stepping over it. Queries search that much smaller graph and the path found
+is refined back into cells with the paths cached for every link.
+
+Paths are usually within a few percent of the cheapest one, but not always
+the cheapest, since they can only cross borders at the chosen crossings.
+"""
+
+import heapq
+
+from .heaps import IndexedHeap
+from .results import SearchResult, exhausted, path_cost, run
+
+# Border runs at least this long get a crossing at each end instead of a
+# single one in the middle.
+LONG_ENTRANCE = 6
+
+
+class ClusterGraph:
+    """Abstract graph of a grid.Grid object, split in clusters.
+
+    The graph is built from the grid it was given, and only searches that
+    grid. After cells change, tell it with update_cell: the clusters
+    touching the cell are marked as out of date and computed again on the
+    next search, and the others are kept.
+    """
+
+    def __init__(self, grid, cluster_size=10):
+        """Initialise the object.
+
+        Args:
+            grid: grid.Grid object. Weights must be at least 1.
+
+            cluster_size: Side, in cells, of the clusters.
+        """
+
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.columns = -(-grid.width // cluster_size)
+        self.rows = -(-grid.height // cluster_size)
+        # Number of cluster and border computations done so far
+        self.rebuilt_clusters = 0
+        self.rebuilt_borders = 0
+
+        # Crossings of each border, keyed by the pair of clusters it joins,
+        # as (cell, cell) tuples.
+        self._crossings = {}
+        # Links across borders and inside clusters: node -> {node: cost}
+        self._inter = {}
+        self._intra = {}
+        # Cells of the cached path of each intra link: (node, node) -> path
+        self._paths = {}
+        self._nodes = {}
+
+        self._dirty_borders = set(self._borders())
+        self._dirty_clusters = set(range(self.columns * self.rows))
+
+    def matches(self, grid):
+        """Tells whether grid holds the same cells as the grid the graph
+        follows: it's that grid, or a copy not edited since, going by their
+        versions.
+        """
+
+        return grid.version == self.grid.version
+
+    def cluster(self, cell):
+        """Gets the number of the cluster holding cell."""
+
+        x, y = self.grid.coords(cell)
+        size = self.cluster_size
+        return (y // size) * self.columns + x // size
+
+    def update_cell(self, cell):
+        """Takes into account that cell was blocked, unblocked or reweighted.
+
+        Args:
+            cell: Index of the cell changed, or None if any cell may have
+                  changed.
+        """
+
+        if cell is None:
+            self._dirty_borders.update(self._borders())
+            self._dirty_clusters.update(range(self.columns * self.rows))
+            return
+
+        cluster = self.cluster(cell)
+        x, y = self.grid.coords(cell)
+        x0, y0, x1, y1 = self._bounds(cluster)
+        self._dirty_clusters.add(cluster)
+        touched = []
+        if x == x0 and x0 > 0:
+            touched.append(cluster - 1)
+        if x == x1 and x1 < self.grid.width - 1:
+            touched.append(cluster + 1)
+        if y == y0 and y0 > 0:
+            touched.append(cluster - self.columns)
+        if y == y1 and y1 < self.grid.height - 1:
+            touched.append(cluster + self.columns)
+        for other in touched:
+            self._dirty_borders.add((min(cluster, other), max(cluster, other)))
+            self._dirty_clusters.add(other)
+
+    def refresh(self):
+        """Computes again whatever update_cell marked as out of date."""
+
+        run(self._refresh_steps())
+
+    def _refresh_steps(self):
+        # update_cell may be called between steps, so the sets are emptied
+        # one item at a time.
+        while self._dirty_borders:
+            self._build_border(self._dirty_borders.pop())
+            yield
+        while self._dirty_clusters:
+            self._build_cluster(self._dirty_clusters.pop())
+            yield
+
+    def search(self, start, goal, observer=None, budget=None):
+        """Finds a path through the abstract graph and refines it into cells.
+
+        Args:
+            start: Index of the cell where the path begins.
+
+            goal: Index of the cell to reach.
+
+            observer: Optional events.Observer object told about the
+                      progress of the searches linking start and goal to
+                      the graph, then of the search on the graph, whose
+                      open set holds nodes.
+
+            budget: Optional budgets.Budget object limiting the search. It's
+                    only checked during the search on the graph, so the
+                    time computing the clusters again and linking start and
+                    goal to them adds to the time limit.
+
+        Returns:
+            SearchResult object. expanded counts the cells expanded to link
+            start and goal to the graph plus the nodes expanded on it.
+        """
+
+        return run(self.search_steps(start, goal, observer, budget))
+
+    def search_steps(self, start, goal, observer=None, budget=None):
+        """Stepper of search. It yields after each border or cluster
+        computed again and each node expanded.
+
+        Cells edited between steps start the search over, once the graph
+        is computed again, so that the abstract path and the cells it's
+        refined into come from the same terrain.
+        """
+
+        deadline = None if budget is None else budget.deadline()
+        while True:
+            yield from self._refresh_steps()
+            result = yield from self._search_steps(
+                start, goal, observer, budget, deadline, self.grid.version)
+            if result is not None:
+                return result
+
+    def _search_steps(self, start, goal, observer, budget, deadline,
+                      version):
+        """Searches the graph as it is at version of the grid.
+
+        Returns:
+            SearchResult object, or None if the grid changed meanwhile.
+        """
+
+        grid = self.grid
+        if start == goal:
+            if observer is not None:
+                observer.path_found([start], 0)
+            return SearchResult(True, [start], 0, 0)
+
+        start_cluster, goal_cluster = self.cluster(start), self.cluster(goal)
+        targets = set(self._nodes[start_cluster])
+        if goal_cluster == start_cluster:
+            targets.add(goal)
+        start_g, start_from, expanded = self._local_search(
+            start, start_cluster, targets, False, observer)
+        goal_g, goal_to, goal_expanded = self._local_search(
+            goal, goal_cluster, set(self._nodes[goal_cluster]), True, observer)
+        expanded += goal_expanded
+
+        def links(node):
+            if node == start:
+                found = {target: start_g[target] for target in targets
+                         if target in start_g}
+                found.update(self._inter.get(start, {}))
+                return found
+            found = dict(self._intra[self.cluster(node)].get(node, {}))
+            found.update(self._inter.get(node, {}))
+            if node in goal_g:
+                found[goal] = goal_g[node]
+            return found
+
+        g_score = {start: 0}
+        came_from = {}
+        h = grid.manhattan(start, goal)
+        open_set = IndexedHeap()
+        open_set.push(start, (h, h))
+        if observer is not None:
+            observer.open_set(open_set)
+            observer.push(start, 0)
+        closest, closest_h = start, float("inf")
+
+        while open_set:
+            _, current = open_set.pop()
+            if observer is not None:
+                observer.pop(current)
+            if current == goal:
+                path = self._refine(came_from, start, goal, start_from,
+                                    goal_to)
+                cost = path_cost(grid, path)
+                if observer is not None:
+                    observer.path_found(path, cost)
+                return SearchResult(True, path, expanded, cost)
+
+            if budget is not None:
+                if budget.exhausted(deadline, expanded,
+                                    len(start_g) + len(goal_g) + len(g_score)):
+                    # Without goal_to, the path ends at closest
+                    return exhausted(grid, self._refine(
+                        came_from, start, closest, start_from, {}), expanded)
+                h = grid.manhattan(current, goal)
+                if h < closest_h:
+                    closest, closest_h = current, h
+
+            expanded += 1
+            for target, cost in links(current).items():
+                tentative_g = g_score[current] + cost
+                if tentative_g < g_score.get(target, float("inf")):
+                    if observer is not None:
+                        if target in g_score:
+                            observer.relax(target, tentative_g)
+                        else:
+                            observer.push(target, tentative_g)
+                    g_score[target] = tentative_g
+                    came_from[target] = current
+                    h = grid.manhattan(target, goal)
+                    open_set.push(target, (tentative_g + h, h))
+
+            if observer is not None:
+                observer.close(current)
+            yield
+            if grid.version != version:
+                return None
+
+        return SearchResult(False, expanded=expanded)
+
+    def _refine(self, came_from, start, goal, start_from, goal_to):
+        """Turns the nodes of an abstract path into the cells between them."""
+
+        nodes = [goal]
+        while nodes[-1] in came_from:
+            nodes.append(came_from[nodes[-1]])
+        nodes.reverse()
+
+        path = [start]
+        for source, target in zip(nodes, nodes[1:]):
+            if source == start and target in start_from:
+                segment = [target]
+                while segment[-1] in start_from:
+                    segment.append(start_from[segment[-1]])
+                segment.reverse()
+            elif target == goal and source in goal_to:
+                segment = [source]
+                while segment[-1] != goal:
+                    segment.append(goal_to[segment[-1]])
+            elif target in self._inter.get(source, {}):
+                segment = [source, target]
+            else:
+                segment = self._paths[source, target]
+            path.extend(segment[1:])
+        return path
+
+    def _borders(self):
+        """Yields the pairs of neighbouring clusters."""
+
+        for cluster in range(self.columns * self.rows):
+            if cluster % self.columns < self.columns - 1:
+                yield cluster, cluster + 1
+            if cluster + self.columns < self.columns * self.rows:
+                yield cluster, cluster + self.columns
+
+    def _cluster_borders(self, cluster):
+        """Gets the borders of a cluster, as keys of _crossings."""
+
+        column = cluster % self.columns
+        borders = []
+        if column > 0:
+            borders.append((cluster - 1, cluster))
+        if column < self.columns - 1:
+            borders.append((cluster, cluster + 1))
+        if cluster >= self.columns:
+            borders.append((cluster - self.columns, cluster))
+        if cluster + self.columns < self.columns * self.rows:
+            borders.append((cluster, cluster + self.columns))
+        return borders
+
+    def _bounds(self, cluster):
+        """Gets the first and last column and row of a cluster."""
+
+        size = self.cluster_size
+        row, column = divmod(cluster, self.columns)
+        x0, y0 = column * size, row * size
+        return (x0, y0, min(x0 + size, self.grid.width) - 1,
+                min(y0 + size, self.grid.height) - 1)
+
+    def _build_border(self, border):
+        """Finds the crossings between two neighbouring clusters."""
+
+        grid = self.grid
+        blocked = grid.blocked
+        first, second = border
+        x0, y0, x1, y1 = self._bounds(first)
+        if second == first + self.columns:
+            pairs = [(grid.index(x, y1), grid.index(x, y1 + 1))
+                     for x in range(x0, x1 + 1)]
+        else:
+            pairs = [(grid.index(x1, y), grid.index(x1 + 1, y))
+                     for y in range(y0, y1 + 1)]
+
+        for inside, outside in self._crossings.get(border, ()):
+            self._inter[inside].pop(outside, None)
+            self._inter[outside].pop(inside, None)
+
+        crossings = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and not (blocked[pair[0]] or blocked[pair[1]]):
+                run.append(pair)
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                crossings.extend((run[0], run[-1]))
+            elif run:
+                crossings.append(run[len(run) // 2])
+            run = []
+
+        weights = grid.weights
+        for inside, outside in crossings:
+            self._inter.setdefault(inside, {})[outside] = weights[outside]
+            self._inter.setdefault(outside, {})[inside] = weights[inside]
+        self._crossings[border] = crossings
+        self.rebuilt_borders += 1
+
+    def _build_cluster(self, cluster):
+        """Links the nodes of a cluster by their cheapest paths inside it."""
+
+        nodes = set()
+        for border in self._cluster_borders(cluster):
+            for pair in self._crossings.get(border, ()):
+                nodes.update(cell for cell in pair
+                             if self.cluster(cell) == cluster)
+
+        for node in self._intra.get(cluster, {}):
+            for target in self._intra[cluster][node]:
+                del self._paths[node, target]
+
+        links = {}
+        for node in nodes:
+            g, came_from, _ = self._local_search(node, cluster, nodes - {node},
+                                                 False)
+            links[node] = {}
+            for target in nodes:
+                if target != node and target in g:
+                    links[node][target] = g[target]
+                    path = [target]
+                    while path[-1] != node:
+                        path.append(came_from[path[-1]])
+                    path.reverse()
+                    self._paths[node, target] = path
+
+        self._nodes[cluster] = sorted(nodes)
+        self._intra[cluster] = links
+        self.rebuilt_clusters += 1
+
+    def _local_search(self, source, cluster, targets, reverse, observer=None):
+        """Dijkstra's algorithm from source without leaving its cluster.
+
+        Args:
+            source: Index of the cell where the search begins.
+
+            cluster: Number of the cluster to search in.
+
+            targets: set object with the cells to reach. The search stops
+                     once they are all expanded.
+
+            reverse: If True, g holds the cost of going from each cell to
+                     source instead of the other way round.
+
+            observer: Optional events.Observer object, as in search.
+
+        Returns:
+            A tuple (g, came_from, expanded), where came_from maps each cell
+            to the cell before it, or after it when reversing.
+        """
+
+        grid = self.grid
+        weights = grid.weights
+        x0, y0, x1, y1 = self._bounds(cluster)
+        width = grid.width
+        g = {source: 0}
+        came_from = {}
+        done = set()
+        remaining = len(targets)
+        queue = [(0, source)]
+        expanded = 0
+
+        if grid.blocked[source]:
+            return g, came_from, expanded
+        if observer is not None:
+            observer.push(source, 0)
+
+        while queue and remaining:
+            current_g, current = heapq.heappop(queue)
+            if current in done:
+                continue
+            if observer is not None:
+                observer.pop(current)
+            done.add(current)
+            if current in targets:
+                remaining -= 1
+
+            expanded += 1
+            for neighbour in grid.neighbours(current):
+                if not (x0 <= neighbour % width <= x1
+                        and y0 <= neighbour // width <= y1):
+                    continue
+                step = weights[current] if reverse else weights[neighbour]
+                tentative_g = current_g + step
+                if tentative_g < g.get(neighbour, float("inf")):
+                    if observer is not None:
+                        if neighbour in g:
+                            observer.relax(neighbour, tentative_g)
+                        else:
+                            observer.push(neighbour, tentative_g)
+                    g[neighbour] = tentative_g
+                    came_from[neighbour] = current
+                    heapq.heappush(queue, (tentative_g, neighbour))
+
+            if observer is not None:
+                observer.close(current)
+
+        return g, came_from, expanded
+
+
+def hpa(grid, start, goal, observer=None, clusters=None, budget=None):
+    """Hierarchical A* (HPA*). Paths are close to, but not always, the
+    cheapest.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        start: Index of the cell where the search begins.
+
+        goal: Index of the cell to reach.
+
+        observer: Optional events.Observer object, as in
+                  ClusterGraph.search.
+
+        clusters: Optional ClusterGraph object built from grid and kept up
+                  to date with it. Without it, one is built for this search
+                  only, which costs more than a flat search.
+
+        budget: Optional budgets.Budget object, as in ClusterGraph.search.
+
+    Returns:
+        SearchResult object.
+    """
+
+    return run(hpa_steps(grid, start, goal, observer, clusters, budget))
+
+
+def hpa_steps(grid, start, goal, observer=None, clusters=None, budget=None):
+    """Stepper of hpa. Building the cluster graph, when it's not given, is
+    done at once.
+    """
+
+    if clusters is None:
+        clusters = ClusterGraph(grid)
+    elif not clusters.matches(grid):
+        raise ValueError("The cluster graph was built for another grid")
+    return clusters.search_steps(start, goal, observer, budget)
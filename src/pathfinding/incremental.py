@@ -0,0 +1,193 @@
+"""incremental.py module
+
+D* Lite, a planner that keeps its search between queries. After cells change
+or the start moves, it only repairs the part of the search those changes
+affect instead of searching again from scratch.
+"""
+
+from .heaps import IndexedHeap
+from .results import SearchResult, run
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+    """D* Lite planner (Koenig and Likhachev) over a grid.Grid object.
+
+    The search grows backwards from the goal, so g holds the cost from each
+    cell to the goal and stays valid while the start moves. The planner reads
+    the grid it was given, so after editing a cell, tell it with
+    update_cell before planning again.
+    """
+
+    def __init__(self, grid, start, goal, observer=None):
+        """Initialise the object.
+
+        Args:
+            grid: grid.Grid object. Weights must be at least 1.
+
+            start: Index of the cell where the path begins.
+
+            goal: Index of the cell to reach.
+
+            observer: Optional events.Observer object told about the
+                      progress of every plan. Costs are measured from the
+                      goal, since the search runs backwards.
+        """
+
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.observer = observer
+
+        self._g = {}
+        self._rhs = {goal: 0}
+        self._key_modifier = 0
+        self._open_set = IndexedHeap()
+        self._open_set.push(goal, self._key(goal))
+        if observer is not None:
+            observer.open_set(self._open_set)
+            observer.push(goal, 0)
+
+    def move_to(self, cell):
+        """Moves the start of the path to cell, usually the next cell of the
+        last path planned.
+        """
+
+        self._key_modifier += self.grid.manhattan(self.start, cell)
+        self.start = cell
+
+    def update_cell(self, cell):
+        """Takes into account that cell was blocked, unblocked or reweighted.
+
+        Args:
+            cell: Index of the cell changed.
+        """
+
+        self._update_vertex(cell)
+        for neighbour in self._around(cell):
+            self._update_vertex(neighbour)
+
+    def plan(self):
+        """Brings the search up to date and extracts the path from start.
+
+        Returns:
+            SearchResult object. expanded only counts the cells expanded by
+            this call.
+        """
+
+        return run(self.plan_steps())
+
+    def plan_steps(self):
+        """Stepper of plan. The grid must not change until it's finished."""
+
+        expanded = yield from self._compute_shortest_path()
+        cost = self._g.get(self.start, INFINITY)
+        if cost == INFINITY:
+            return SearchResult(False, expanded=expanded)
+
+        # Each step goes to the successor with the cheapest way to the goal.
+        path = [self.start]
+        current = self.start
+        while current != self.goal and len(path) <= len(self.grid):
+            current = min(self._around(current),
+                          key=lambda cell: self._cost(current, cell)
+                          + self._g.get(cell, INFINITY))
+            path.append(current)
+        if self.observer is not None:
+            self.observer.path_found(path, cost)
+        return SearchResult(True, path, expanded, cost)
+
+    def _around(self, cell):
+        """All the orthogonal neighbours of cell, blocked or not."""
+
+        width = self.grid.width
+        x = cell % width
+        around = []
+        if cell >= width:
+            around.append(cell - width)
+        if cell + width < len(self.grid):
+            around.append(cell + width)
+        if x > 0:
+            around.append(cell - 1)
+        if x < width - 1:
+            around.append(cell + 1)
+        return around
+
+    def _cost(self, source, target):
+        blocked = self.grid.blocked
+        if blocked[source] or blocked[target]:
+            return INFINITY
+        return self.grid.weights[target]
+
+    def _key(self, cell):
+        best = min(self._g.get(cell, INFINITY), self._rhs.get(cell, INFINITY))
+        return (best + self.grid.manhattan(self.start, cell)
+                + self._key_modifier, best)
+
+    def _update_vertex(self, cell):
+        g = self._g
+        if cell != self.goal:
+            self._rhs[cell] = min(self._cost(cell, successor)
+                                  + g.get(successor, INFINITY)
+                                  for successor in self._around(cell))
+        queued = cell in self._open_set
+        if queued:
+            self._open_set.remove(cell)
+        if g.get(cell, INFINITY) != self._rhs.get(cell, INFINITY):
+            key = self._key(cell)
+            self._open_set.update(cell, key)
+            if self.observer is not None:
+                if queued:
+                    self.observer.relax(cell, key[1])
+                else:
+                    self.observer.push(cell, key[1])
+
+    def _compute_shortest_path(self):
+        g, rhs = self._g, self._rhs
+        open_set = self._open_set
+        start = self.start
+        expanded = 0
+
+        while open_set and (open_set.peek()[0] < self._key(start)
+                            or rhs.get(start, INFINITY)
+                            != g.get(start, INFINITY)):
+            old_key, cell = open_set.pop()
+            new_key = self._key(cell)
+            if old_key < new_key:
+                open_set.update(cell, new_key)
+                continue
+
+            expanded += 1
+            if self.observer is not None:
+                self.observer.pop(cell)
+            if g.get(cell, INFINITY) > rhs.get(cell, INFINITY):
+                g[cell] = rhs[cell]
+                to_update = self._around(cell)
+            else:
+                g[cell] = INFINITY
+                to_update = self._around(cell) + [cell]
+
+            for neighbour in to_update:
+                self._update_vertex(neighbour)
+            if self.observer is not None:
+                self.observer.close(cell)
+            yield
+
+        return expanded
+
+
+def dstar_lite(grid, start, goal, observer=None):
+    """Plans once with D* Lite. Takes the same arguments as solvers.astar.
+
+    Only useful for comparisons: keep a DStarLite object to benefit from
+    replanning.
+    """
+
+    return DStarLite(grid, start, goal, observer).plan()
+
+
+def dstar_lite_steps(grid, start, goal, observer=None):
+    """Stepper of dstar_lite."""
+
+    return DStarLite(grid, start, goal, observer).plan_steps()
@@ -0,0 +1,375 @@
+"""jps.py module
+
+Jump Point Search for 4-connected grids.
+
+Open grids have many equally cheap paths between two cells. JPS only follows
+the canonical ones: vertical moves come first, and a horizontal move is only
+followed by a vertical one when that turn is forced, that is, when the cell
+from which the same vertical move could have been made one step earlier is
+blocked or heavier. Cells where a canonical path can't turn are jumped over,
+so only the jump points, where it can, reach the open set.
+
+Since the forced turns take weights into account, weighted grids give the
+same costs as Dijkstra's algorithm. Jumps are just shorter where weights
+vary, and longest over regions of equal weight.
+"""
+
+from array import array
+from itertools import accumulate
+
+from .heaps import IndexedHeap
+from .landmarks import terrain_checksum
+from .results import SearchResult, exhausted, path_cost, run
+
+
+def _forced_turns(grid, cell, dx):
+    """Gets the vertical steps forced at cell when moving horizontally.
+
+    Args:
+        grid: grid.Grid object.
+
+        cell: Index of the cell just entered.
+
+        dx: 1 when moving right, -1 when moving left.
+
+    Returns:
+        list object with the forced index steps, -width and/or width.
+    """
+
+    blocked = grid.blocked
+    weights = grid.weights
+    size = len(blocked)
+    previous = cell - dx
+    forced = []
+    for step in (-grid.width, grid.width):
+        turn = cell + step
+        if 0 <= turn < size and not blocked[turn]:
+            side = previous + step
+            if blocked[side] or weights[side] > weights[cell]:
+                forced.append(step)
+    return forced
+
+
+class JumpTable:
+    """Jump distances precomputed for every cell of a static grid (JPS+).
+
+    For each cell and direction it stores how many cells away the next jump
+    point is, or minus the number of open cells before a wall when there's
+    none. It also keeps running sums of the weights, so the cost of a jump is
+    looked up too. Jumps then take constant time, whatever their length.
+
+    The table describes the grid as it was when the table was built, so it
+    must be built again after cells are blocked, unblocked or reweighted.
+    jps refuses it once the grid no longer matches.
+
+    Attributes:
+        version: Grid.version the table was last found to match.
+
+        checksum: landmarks.terrain_checksum of the grid the table was built
+                  from.
+    """
+
+    def __init__(self, grid):
+        """Initialise the object.
+
+        Args:
+            grid: grid.Grid object.
+        """
+
+        width, height = grid.width, grid.height
+        size = width * height
+        blocked = grid.blocked
+        weights = grid.weights
+
+        self.width = width
+        self.height = height
+        self.version = grid.version
+        self.checksum = terrain_checksum(grid)
+        self.east = east = array("i", bytes(4 * size))
+        self.west = west = array("i", bytes(4 * size))
+        self.south = south = array("i", bytes(4 * size))
+        self.north = north = array("i", bytes(4 * size))
+
+        for row_start in range(0, size, width):
+            row_end = row_start + width - 1
+            for cell in range(row_end - 1, row_start - 1, -1):
+                east[cell] = self._extend(grid, cell + 1, east[cell + 1],
+                                          bool(_forced_turns(grid, cell + 1, 1)))
+            for cell in range(row_start + 1, row_end + 1):
+                west[cell] = self._extend(grid, cell - 1, west[cell - 1],
+                                          bool(_forced_turns(grid, cell - 1, -1)))
+
+        for cell in range(size - width - 1, -1, -1):
+            below = cell + width
+            south[cell] = self._extend(grid, below, south[below],
+                                       east[below] > 0 or west[below] > 0)
+        for cell in range(width, size):
+            above = cell - width
+            north[cell] = self._extend(grid, above, north[above],
+                                       east[above] > 0 or west[above] > 0)
+
+        # row_cost[b] - row_cost[a] is the weight of the cells after a up to
+        # b in the same row, column_cost does the same for columns.
+        self.row_cost = array("q", accumulate(weights))
+        self.column_cost = column_cost = array("q", list(weights))
+        for cell in range(width, size):
+            column_cost[cell] += column_cost[cell - width]
+
+    @staticmethod
+    def _extend(grid, following, following_value, is_jump_point):
+        """Computes the value of a cell from the one following it."""
+
+        if grid.blocked[following]:
+            return 0
+        if is_jump_point:
+            return 1
+        return following_value + 1 if following_value > 0 else following_value - 1
+
+    def matches(self, grid):
+        """Tells whether the table describes the terrain grid has now.
+
+        Grids of the version the table was last matched with are accepted
+        at once. Others, like the grid after its visit states were reset,
+        are compared by checksum, which reads every cell.
+        """
+
+        if self.width != grid.width or self.height != grid.height:
+            return False
+        if grid.version == self.version:
+            return True
+        if terrain_checksum(grid) != self.checksum:
+            return False
+        self.version = grid.version
+        return True
+
+
+def jps(grid, start, goal, observer=None, jump_table=None, budget=None):
+    """Jump Point Search. Finds the same path costs as Dijkstra's algorithm.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        start: Index of the cell where the search begins.
+
+        goal: Index of the cell to reach.
+
+        observer: Optional events.Observer object told about the progress
+                  of the search. Only jump points enter the open set.
+
+        jump_table: Optional JumpTable object built from grid. Without it,
+                    jumps scan the grid cell by cell.
+
+        budget: Optional budgets.Budget object limiting the search. Only
+                jump points count as expanded and stored. It's checked
+                between jump points, which without a jump table can be far
+                apart on open grids.
+
+    Returns:
+        SearchResult object. expanded counts the jump points expanded.
+
+    Raises:
+        ValueError: If jump_table was built from another terrain, including
+                    grid before its cells were last edited.
+    """
+
+    return run(jps_steps(grid, start, goal, observer, jump_table, budget))
+
+
+def jps_steps(grid, start, goal, observer=None, jump_table=None,
+              budget=None):
+    """Stepper of jps."""
+
+    if jump_table is not None and not jump_table.matches(grid):
+        raise ValueError("The jump table was built for another terrain")
+
+    width = grid.width
+    if jump_table is None:
+        jump_horizontally, jump_vertically = _scanning_jumps(grid, goal)
+    else:
+        jump_horizontally, jump_vertically = _table_jumps(grid, goal,
+                                                          jump_table)
+
+    g_score = {start: 0}
+    came_from = {}
+    # Direction of the last move into each jump point, None for the start
+    arrived_by = {start: None}
+    h = grid.manhattan(start, goal)
+    open_set = IndexedHeap()
+    open_set.push(start, (h, h))
+    if observer is not None:
+        observer.open_set(open_set)
+        observer.push(start, 0)
+    expanded = 0
+    deadline = None if budget is None else budget.deadline()
+    closest, closest_h = start, float("inf")
+
+    while open_set:
+        _, current = open_set.pop()
+        if observer is not None:
+            observer.pop(current)
+        if current == goal:
+            path = _join_jumps(came_from, current, width)
+            cost = path_cost(grid, path)
+            if observer is not None:
+                observer.path_found(path, cost)
+            return SearchResult(True, path, expanded, cost)
+
+        if budget is not None:
+            if budget.exhausted(deadline, expanded, len(g_score)):
+                return exhausted(grid, _join_jumps(came_from, closest, width),
+                                 expanded)
+            h = grid.manhattan(current, goal)
+            if h < closest_h:
+                closest, closest_h = current, h
+
+        expanded += 1
+        arrival = arrived_by[current]
+        if arrival is None:
+            horizontal, vertical = (1, -1), (width, -width)
+        elif arrival in (1, -1):
+            horizontal = (arrival,)
+            vertical = _forced_turns(grid, current, arrival)
+        else:
+            horizontal, vertical = (1, -1), (arrival,)
+
+        jumps = ([(dx, jump_horizontally(current, dx)) for dx in horizontal]
+                 + [(dy, jump_vertically(current, dy)) for dy in vertical])
+        for step, jump in jumps:
+            if jump is None:
+                continue
+            jump_point, cost = jump
+            tentative_g = g_score[current] + cost
+            if tentative_g < g_score.get(jump_point, float("inf")):
+                if observer is not None:
+                    if jump_point in g_score:
+                        observer.relax(jump_point, tentative_g)
+                    else:
+                        observer.push(jump_point, tentative_g)
+                g_score[jump_point] = tentative_g
+                came_from[jump_point] = current
+                arrived_by[jump_point] = step
+                h = grid.manhattan(jump_point, goal)
+                open_set.push(jump_point, (tentative_g + h, h))
+
+        if observer is not None:
+            observer.close(current)
+        yield
+
+    return SearchResult(False, expanded=expanded)
+
+
+def _join_jumps(came_from, current, width):
+    """Rebuilds the full path, cell by cell, from the jump points."""
+
+    jump_points = [current]
+    while current in came_from:
+        current = came_from[current]
+        jump_points.append(current)
+    jump_points.reverse()
+
+    path = jump_points[:1]
+    for source, target in zip(jump_points, jump_points[1:]):
+        if source // width == target // width:
+            step = 1 if target > source else -1
+        else:
+            step = width if target > source else -width
+        path.extend(range(source + step, target + step, step))
+    return path
+
+
+def _scanning_jumps(grid, goal):
+    """Creates jump functions walking the grid one cell at a time.
+
+    Both take the cell to jump from and the index step of the direction, and
+    return a tuple (jump_point, cost) or None when they hit a wall.
+    """
+
+    width = grid.width
+    size = len(grid)
+    blocked = grid.blocked
+    weights = grid.weights
+
+    def jump_horizontally(cell, dx):
+        cost = 0
+        x = cell % width
+        while True:
+            x += dx
+            if not 0 <= x < width:
+                return None
+            cell += dx
+            if blocked[cell]:
+                return None
+            cost += weights[cell]
+            if cell == goal or _forced_turns(grid, cell, dx):
+                return cell, cost
+
+    def jump_vertically(cell, dy):
+        cost = 0
+        while True:
+            cell += dy
+            if not 0 <= cell < size or blocked[cell]:
+                return None
+            cost += weights[cell]
+            if (cell == goal or jump_horizontally(cell, 1) is not None
+                    or jump_horizontally(cell, -1) is not None):
+                return cell, cost
+
+    return jump_horizontally, jump_vertically
+
+
+def _table_jumps(grid, goal, table):
+    """Creates jump functions reading a JumpTable. See _scanning_jumps."""
+
+    width = grid.width
+    weights = grid.weights
+    row_cost = table.row_cost
+    column_cost = table.column_cost
+    goal_row, goal_column = divmod(goal, width)
+
+    def horizontal_reach(cell, dx):
+        value = table.east[cell] if dx == 1 else table.west[cell]
+        return value, value if value > 0 else -value
+
+    def jump_horizontally(cell, dx):
+        value, reach = horizontal_reach(cell, dx)
+        target = None
+        if cell // width == goal_row and 0 < (goal - cell) * dx <= reach:
+            target = goal
+        elif value > 0:
+            target = cell + value * dx
+        else:
+            return None
+
+        if dx == 1:
+            return target, row_cost[target] - row_cost[cell]
+        return target, (row_cost[cell] - weights[cell]
+                        - row_cost[target] + weights[target])
+
+    def jump_vertically(cell, dy):
+        down = dy > 0
+        value = table.south[cell] if down else table.north[cell]
+        reach = value if value > 0 else -value
+
+        target = None
+        rows_to_goal = (goal_row - cell // width) * (1 if down else -1)
+        if 0 < rows_to_goal <= reach:
+            crossing = cell + rows_to_goal * dy
+            column = crossing % width
+            if crossing == goal:
+                target = goal
+            elif column != goal_column:
+                dx = 1 if goal_column > column else -1
+                _, side_reach = horizontal_reach(crossing, dx)
+                if abs(goal_column - column) <= side_reach:
+                    target = crossing
+        if target is None:
+            if value <= 0:
+                return None
+            target = cell + value * dy
+
+        if down:
+            return target, column_cost[target] - column_cost[cell]
+        return target, (column_cost[cell] - weights[cell]
+                        - column_cost[target] + weights[target])
+
+    return jump_horizontally, jump_vertically
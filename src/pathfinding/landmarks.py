@@ -0,0 +1,195 @@
+"""landmarks.py module
+
+Landmark tables for the ALT heuristic (A*, landmarks and the triangle
+inequality).
+
+A few cells of the grid are picked as landmarks and the cost of the
+cheapest path from each of them to every cell is computed beforehand. For
+any landmark L, no path from a cell to the goal can cost less than the
+difference of their distances to L, which unlike the manhattan distance
+takes walls and weights into account. Tables take 4 bytes per cell and
+landmark, and maps.save_landmarks keeps them next to a map for later runs.
+"""
+
+import heapq
+import random
+import zlib
+from array import array
+
+# Distance of the cells no path from a landmark reaches
+UNREACHABLE = 0xFFFFFFFF
+DEFAULT_COUNT = 8
+
+
+class LandmarkTable:
+    """Distances from landmark cells to every cell of a grid.
+
+    Moving onto a cell costs its weight and neighbours are mutual, so the
+    cheapest path from a cell to a landmark is the reverse of the one from
+    the landmark, and only the distances from each landmark are stored.
+
+    The table describes the grid as it was when the table was built, so it
+    must be built again after cells are blocked, unblocked or reweighted.
+    On the edited grid, its bounds may exceed the cost of the paths left,
+    so solvers.alt refuses it.
+
+    Attributes:
+        width, height: Size of the grid.
+
+        landmarks: Indexes of the landmark cells.
+
+        distances: One array of unsigned ints per landmark, with the cost of
+                   the cheapest path from it to each cell, or UNREACHABLE.
+
+        checksum: terrain_checksum of the grid the table was built from.
+
+        version: Grid.version the table was last found to match, or None
+                 for tables read from a file that weren't matched yet.
+    """
+
+    def __init__(self, grid, count=DEFAULT_COUNT, seed=0):
+        """Initialise the object. Each landmark costs a run of Dijkstra's
+        algorithm over the whole grid.
+
+        Landmarks are spread out: the first is the cell farthest from a
+        cell picked at random, and each next one the cell farthest from the
+        landmarks picked before. They all end up in the same connected part
+        of the grid, so searches elsewhere get no help from them.
+
+        Args:
+            grid: grid.Grid object.
+
+            count: Number of landmarks.
+
+            seed: Seed of the random generator picking the first cell.
+        """
+
+        self.width = grid.width
+        self.height = grid.height
+        self.landmarks = []
+        self.distances = []
+        self.checksum = terrain_checksum(grid)
+        self.version = grid.version
+
+        open_cells = [cell for cell, blocked in enumerate(grid.blocked)
+                      if not blocked]
+        if not open_cells:
+            return
+        # Distance of each cell to the closest landmark
+        closest = _distances(grid, random.Random(seed).choice(open_cells))
+        for _ in range(count):
+            landmark = max(range(len(closest)), key=lambda cell: (
+                -1 if closest[cell] == UNREACHABLE else closest[cell]))
+            if landmark in self.landmarks:
+                break
+            distances = _distances(grid, landmark)
+            closest = (distances if not self.landmarks
+                       else array("I", map(min, closest, distances)))
+            self.landmarks.append(landmark)
+            self.distances.append(distances)
+
+    @classmethod
+    def from_distances(cls, width, height, landmarks, distances, checksum):
+        """Creates a table from distances computed before, usually read by
+        maps.load_landmarks. Arguments are the attributes of the table.
+        """
+
+        table = cls.__new__(cls)
+        table.width = width
+        table.height = height
+        table.landmarks = list(landmarks)
+        table.distances = list(distances)
+        table.checksum = checksum
+        table.version = None
+        return table
+
+    def matches(self, grid):
+        """Tells whether the table was built from the terrain grid has now.
+
+        Grids of the version the table was last matched with are accepted
+        at once. Others, like the grid of a table read from a file, are
+        compared by checksum, which reads every cell.
+        """
+
+        if self.width != grid.width or self.height != grid.height:
+            return False
+        if grid.version == self.version:
+            return True
+        if terrain_checksum(grid) != self.checksum:
+            return False
+        self.version = grid.version
+        return True
+
+    def heuristic(self, grid, goal):
+        """Creates the ALT heuristic of searches towards goal.
+
+        It's the largest of the manhattan distance and of two bounds per
+        landmark L, with d the distances from L and w the weights:
+
+            d(goal) - d(cell), as going from L to goal through cell costs
+            at least d(goal).
+
+            d(cell) - w(cell) - d(goal) + w(goal), the same for going from
+            cell to L through goal, reversed.
+
+        Being the largest of consistent heuristics, it's consistent too.
+
+        Args:
+            grid: grid.Grid object the table was built from.
+
+            goal: Index of the cell to reach.
+
+        Returns:
+            Function taking the index of a cell and returning a lower bound
+            of the cost of the cheapest path from it to goal.
+        """
+
+        weights = grid.weights
+        manhattan = grid.manhattan
+        goal_weight = weights[goal]
+        tables = [(distances, distances[goal])
+                  for distances in self.distances
+                  if distances[goal] != UNREACHABLE]
+
+        def heuristic(cell):
+            best = manhattan(cell, goal)
+            cell_weight = weights[cell]
+            for distances, to_goal in tables:
+                to_cell = distances[cell]
+                if to_cell != UNREACHABLE:
+                    best = max(best, to_goal - to_cell,
+                               to_cell - cell_weight - to_goal + goal_weight)
+            return best
+
+        return heuristic
+
+
+def terrain_checksum(grid):
+    """CRC-32 of the blocked flags and weights of a grid."""
+
+    return zlib.crc32(grid.weights, zlib.crc32(grid.blocked))
+
+
+def _distances(grid, source):
+    """Dijkstra's algorithm from source over the whole grid.
+
+    Returns:
+        array of unsigned ints with the cost of the cheapest path from
+        source to each cell, or UNREACHABLE.
+    """
+
+    weights = grid.weights
+    neighbours = grid.neighbours
+    distances = array("I", [UNREACHABLE]) * len(grid)
+    distances[source] = 0
+    heap = [(0, source)]
+    while heap:
+        distance, cell = heapq.heappop(heap)
+        if distance > distances[cell]:
+            continue
+        for neighbour in neighbours(cell):
+            tentative = distance + weights[neighbour]
+            if tentative < distances[neighbour]:
+                distances[neighbour] = tentative
+                heapq.heappush(heap, (tentative, neighbour))
+    return distances
@@ -1,5 +1,7 @@
 """Application Entry"""
 
+import argparse
+
 import pygame
 from basic_engine import game
 
@@ -8,13 +10,22 @@ from . import icon_path, scenes
 pygame.init()
 
 
-def main():
+def main(argv=None):
     """Main Program."""
 
+    parser = argparse.ArgumentParser(
+        prog="moura-pathfinding",
+        description="Application for demonstrating the differences between "
+                    "pathfinding algorithms.")
+    parser.add_argument("map", nargs="?",
+                        help="map to open, saved by the application or a "
+                             "Moving AI .map file")
+    args = parser.parse_args(argv)
+
     app = game.Game(1200, 600, "Pathfinding app", pygame.image.load(icon_path))
 
     app.add_scene("splash_screen", scenes.SplashScreenScene(app.screen))
-    app.add_scene("main", scenes.ApplicationScene(app.screen))
+    app.add_scene("main", scenes.ApplicationScene(app.screen, args.map))
     app.set_initial_view("splash_screen")
 
     app.start()
@@ -0,0 +1,392 @@
+"""maps.py module
+
+Saving and opening grids.
+
+Grids are saved in a compact binary format: a fixed header followed by the
+blocked flags and the weights as they're stored in grid.Grid. Opening such a
+file maps it into memory instead of reading it, so even large maps open at
+once and their pages are only read from disk as the cells are used.
+
+Landmark tables of a map are saved next to it, in a file of their own with
+the same name, and mapped into memory in the same way.
+
+Maps and scenarios of the Moving AI benchmark sets
+(https://movingai.com/benchmarks/) can be read too, line by line.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+
+from .grid import Grid
+from .landmarks import DEFAULT_COUNT, LandmarkTable, terrain_checksum
+
+MAP_EXTENSION = ".pfmap"
+LANDMARKS_EXTENSION = ".pflm"
+
+_MAGIC = b"PFMP"
+_VERSION = 1
+# Magic, version, width, height, start and goal, the last two -1 for none.
+# 32 bytes, so the arrays after it are aligned.
+_HEADER = struct.Struct("<4sB3xIIqq")
+
+_LANDMARKS_MAGIC = b"PFLM"
+_LANDMARKS_VERSION = 1
+# Magic, version, width, height, number of landmarks and checksum of the
+# terrain, followed by the landmarks and their distances as little-endian
+# 32-bit unsigned ints
+_LANDMARKS_HEADER = struct.Struct("<4sB3xIIII")
+
+# Translates the terrain of a Moving AI map into blocked flags. Only the
+# ground ('.' and 'G') and swamps ('S') can be walked on, like in the
+# benchmark sets where water ('W') is only reachable from water.
+_MOVINGAI_BLOCKED = bytes(0 if chr(byte) in ".GS" else 1
+                          for byte in range(256))
+
+
+@dataclass
+class Scenario:
+    """Query of a Moving AI scenario file.
+
+    Attributes:
+        bucket: Group of the query, by the length of its optimal path.
+
+        map_name: Name of the map file the query is for.
+
+        width, height: Size of the map.
+
+        start, goal: Indexes of the cells.
+
+        optimal_length: Length of the optimal path, with the diagonal moves
+                        of the benchmark sets. The solvers here only move
+                        orthogonally, so theirs is usually longer.
+    """
+
+    bucket: int
+    map_name: str
+    width: int
+    height: int
+    start: int
+    goal: int
+    optimal_length: float
+
+
+def save(file_path, grid, start=None):
+    """Saves a grid in the binary format.
+
+    The file is written next to file_path first and then moved over it.
+    Windows can't replace a file still mapped into memory, so if the grid
+    was opened with load, its arrays are copied into memory and the mapping
+    closed first. Other grids mapped from file_path must be dropped before.
+
+    Args:
+        file_path: Path of the file.
+
+        grid: grid.Grid object. Visit states aren't saved.
+
+        start: Optional index of the cell where searches begin.
+    """
+
+    temporary = file_path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(
+            _MAGIC, _VERSION, grid.width, grid.height,
+            -1 if start is None else start,
+            -1 if grid.goal is None else grid.goal))
+        file.write(grid.blocked)
+        file.write(grid.weights)
+
+    mappings = _mappings(grid.blocked, grid.weights)
+    if mappings:
+        grid.blocked = bytearray(grid.blocked)
+        grid.weights = bytearray(grid.weights)
+        _close(mappings)
+    os.replace(temporary, file_path)
+
+
+def load(file_path, mapped=True):
+    """Opens a grid saved in the binary format.
+
+    Args:
+        file_path: Path of the file.
+
+        mapped: Whether to map the file into memory. The grid's blocked flags
+                and weights are then views of the mapping, and changes made
+                to them stay in memory, without reaching the file. Saving
+                the grid with save copies them into new arrays. Otherwise
+                the file is read into new arrays.
+
+    Returns:
+        A tuple (grid, start), where start is the index of the cell where
+        searches begin, or None.
+
+    Raises:
+        ValueError: If the file isn't a grid in the binary format.
+    """
+
+    with open(file_path, "rb") as file:
+        if mapped:
+            data = memoryview(mmap.mmap(file.fileno(), 0,
+                                        access=mmap.ACCESS_COPY))
+        else:
+            data = memoryview(bytearray(file.read()))
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{file_path} isn't a grid file")
+    magic, version, width, height, start, goal = _HEADER.unpack_from(data)
+    size = width * height
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{file_path} isn't a grid file of version "
+                         f"{_VERSION}")
+    if len(data) != _HEADER.size + 2 * size:
+        raise ValueError(f"{file_path} is truncated")
+
+    grid = Grid(width, height, goal=None if goal < 0 else goal)
+    grid.blocked = data[_HEADER.size:_HEADER.size + size]
+    grid.weights = data[_HEADER.size + size:]
+    return grid, None if start < 0 else start
+
+
+def read_map(file_path):
+    """Reads a map of the Moving AI benchmark sets.
+
+    Args:
+        file_path: Path of the .map file.
+
+    Returns:
+        grid.Grid object where every open cell weighs 1.
+
+    Raises:
+        ValueError: If the file isn't a valid map.
+    """
+
+    fields = {}
+    with open(file_path, "rb") as file:
+        for line in file:
+            line = line.strip()
+            if line == b"map":
+                break
+            key, _, value = line.partition(b" ")
+            fields[key] = value
+        else:
+            raise ValueError(f"{file_path} has no map")
+
+        try:
+            width, height = int(fields[b"width"]), int(fields[b"height"])
+        except (KeyError, ValueError):
+            raise ValueError(f"{file_path} has no valid size") from None
+
+        grid = Grid(width, height)
+        blocked = grid.blocked
+        for row in range(height):
+            line = file.readline().rstrip(b"\r\n")
+            if len(line) != width:
+                raise ValueError(f"Row {row} of {file_path} isn't "
+                                 f"{width} cells wide")
+            blocked[row * width:(row + 1) * width] = line.translate(
+                _MOVINGAI_BLOCKED)
+    return grid
+
+
+def read_scenarios(file_path):
+    """Reads the queries of a Moving AI scenario file, one at a time.
+
+    Args:
+        file_path: Path of the .scen file.
+
+    Yields:
+        Scenario objects, in the order of the file.
+
+    Raises:
+        ValueError: If the file isn't a valid scenario file.
+    """
+
+    with open(file_path) as file:
+        if not file.readline().startswith("version"):
+            raise ValueError(f"{file_path} isn't a scenario file")
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                (bucket, map_name, width, height, start_x, start_y, goal_x,
+                 goal_y, optimal_length) = line.split("\t")
+                width, height = int(width), int(height)
+                scenario = Scenario(int(bucket), map_name, width, height,
+                                    int(start_y) * width + int(start_x),
+                                    int(goal_y) * width + int(goal_x),
+                                    float(optimal_length))
+            except ValueError:
+                raise ValueError(f"Invalid scenario in {file_path}: "
+                                 f"{line!r}") from None
+            yield scenario
+
+
+def landmarks_path(map_path):
+    """Gets the path of the landmark tables saved next to a map."""
+
+    return os.path.splitext(map_path)[0] + LANDMARKS_EXTENSION
+
+
+def save_landmarks(file_path, table):
+    """Saves a landmarks.LandmarkTable object. As in save, a table opened
+    with load_landmarks is copied into memory before its file is replaced.
+
+    Args:
+        file_path: Path of the file, usually given by landmarks_path.
+
+        table: landmarks.LandmarkTable object.
+    """
+
+    temporary = file_path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(_LANDMARKS_HEADER.pack(
+            _LANDMARKS_MAGIC, _LANDMARKS_VERSION, table.width, table.height,
+            len(table.landmarks), table.checksum))
+        file.write(_little_endian(array("I", table.landmarks)))
+        file.writelines(map(_little_endian, table.distances))
+
+    mappings = _mappings(*table.distances)
+    if mappings:
+        table.distances = [_copy_ints(values) for values in table.distances]
+        _close(mappings)
+    os.replace(temporary, file_path)
+
+
+def load_landmarks(file_path, grid, mapped=True):
+    """Opens landmark tables saved by save_landmarks.
+
+    Args:
+        file_path: Path of the file.
+
+        grid: grid.Grid object the tables are for.
+
+        mapped: Whether to map the file into memory, as in load. On
+                big-endian machines the file is always read.
+
+    Returns:
+        landmarks.LandmarkTable object.
+
+    Raises:
+        ValueError: If the file isn't a landmarks file, or was saved for
+                    another terrain.
+    """
+
+    mapped = mapped and sys.byteorder == "little"
+    with open(file_path, "rb") as file:
+        if mapped:
+            data = memoryview(mmap.mmap(file.fileno(), 0,
+                                        access=mmap.ACCESS_READ))
+        else:
+            data = memoryview(file.read())
+
+    try:
+        if len(data) < _LANDMARKS_HEADER.size:
+            raise ValueError(f"{file_path} isn't a landmarks file")
+        magic, version, width, height, count, checksum = \
+            _LANDMARKS_HEADER.unpack_from(data)
+        if magic != _LANDMARKS_MAGIC or version != _LANDMARKS_VERSION:
+            raise ValueError(f"{file_path} isn't a landmarks file of version "
+                             f"{_LANDMARKS_VERSION}")
+        size = width * height
+        if len(data) != _LANDMARKS_HEADER.size + 4 * count * (1 + size):
+            raise ValueError(f"{file_path} is truncated")
+        if (width, height) != (grid.width, grid.height) \
+                or checksum != terrain_checksum(grid):
+            raise ValueError(f"{file_path} was saved for another terrain")
+    except ValueError:
+        # Unmapped now, so that the caller can save over the file
+        mappings = _mappings(data)
+        data.release()
+        _close(mappings)
+        raise
+
+    if mapped:
+        values = data[_LANDMARKS_HEADER.size:].cast("I")
+    else:
+        values = array("I")
+        values.frombytes(data[_LANDMARKS_HEADER.size:])
+        if sys.byteorder != "little":
+            values.byteswap()
+    landmarks = list(values[:count])
+    distances = [values[count + index * size:count + (index + 1) * size]
+                 for index in range(count)]
+    return LandmarkTable.from_distances(width, height, landmarks, distances,
+                                        checksum)
+
+
+def open_landmarks(map_path, grid, count=DEFAULT_COUNT):
+    """Opens the landmark tables saved next to a map, or builds and saves
+    them if there are none yet or the terrain changed since.
+
+    Args:
+        map_path: Path of the map grid was opened from.
+
+        grid: grid.Grid object.
+
+        count: Number of landmarks of new tables.
+
+    Returns:
+        landmarks.LandmarkTable object.
+    """
+
+    file_path = landmarks_path(map_path)
+    try:
+        return load_landmarks(file_path, grid)
+    except (OSError, ValueError):
+        pass
+    table = LandmarkTable(grid, count)
+    save_landmarks(file_path, table)
+    return table
+
+
+def _mappings(*views):
+    """Gets the memory mappings the given arrays are views of."""
+
+    return {view.obj for view in views
+            if isinstance(view, memoryview) and isinstance(view.obj, mmap.mmap)}
+
+
+def _close(mappings):
+    """Closes memory mappings once no array uses them anymore."""
+
+    for mapping in mappings:
+        try:
+            mapping.close()
+        except BufferError:
+            # Still used, like by other grids opened from the same file
+            pass
+
+
+def _copy_ints(values):
+    """Copies a memoryview of unsigned ints into an array."""
+
+    copy = array("I")
+    copy.frombytes(values.cast("B"))
+    return copy
+
+
+def _little_endian(values):
+    """Gets the bytes of an array in little-endian order."""
+
+    if sys.byteorder == "little":
+        return values
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
+
+
+def open_map(file_path):
+    """Opens a map saved by save, or a Moving AI .map file, going by the
+    extension.
+
+    Returns:
+        A tuple (grid, start), where start is the index of the cell where
+        searches begin, or None.
+    """
+
+    if file_path.endswith(".map"):
+        return read_map(file_path), None
+    return load(file_path)
@@ -0,0 +1,230 @@
+"""mazes.py module
+
+Seeded generators of terrains.
+
+Each generator builds the blocked flags and weights of a whole grid.Grid at
+once, from a seed, so the same arguments always give the same terrain:
+
+    random_fill: Blocks exactly a given fraction of the cells.
+    backtracker: Perfect maze carved by a randomised depth-first search.
+    prim: Perfect maze grown with the randomised Prim's algorithm.
+    caves: Caves smoothed out of random noise by a cellular automaton.
+
+The mazes have their passages on the cells of even column and row, which
+are all connected to each other.
+"""
+
+import random
+
+from .grid import Grid
+
+# Passable neighbours of a cell of a maze, two cells away
+_MAZE_STEPS = ((0, -2), (0, 2), (-2, 0), (2, 0))
+# Whether a cell of the caves is a wall, by the walls of its neighbourhood
+_CAVE_WALL = bytes(1 if count >= 5 else 0 for count in range(256))
+
+
+def random_fill(width, height, density=0.3, seed=None, weights=(1,),
+                keep=()):
+    """Blocks cells picked at random.
+
+    Args:
+        width, height: Size of the grid.
+
+        density: Fraction of the cells to block. The number of cells blocked
+                 is rounded, but otherwise exact.
+
+        seed: Seed of the random generator, or None for a random one.
+
+        weights: Values the weights are picked from, uniformly.
+
+        keep: Indexes of cells left open. They don't count in density.
+
+    Returns:
+        grid.Grid object.
+    """
+
+    rng = random.Random(seed)
+    size = width * height
+    keep = sorted(set(keep))
+    blocked = bytearray(size)
+    for cell in rng.sample(range(size - len(keep)),
+                           round((size - len(keep)) * density)):
+        # Skips the cells kept, so the picks map onto the other cells
+        for kept in keep:
+            if cell < kept:
+                break
+            cell += 1
+        blocked[cell] = 1
+    return Grid(width, height, blocked, _weights(rng, size, weights))
+
+
+def backtracker(width, height, seed=None, weights=(1,), keep=()):
+    """Carves a maze with a randomised depth-first search. Its corridors are
+    long and wind a lot.
+
+    Args:
+        width, height: Size of the grid.
+
+        seed: Seed of the random generator, or None for a random one.
+
+        weights: Values the weights are picked from, uniformly.
+
+        keep: Indexes of cells left open.
+
+    Returns:
+        grid.Grid object.
+    """
+
+    rng = random.Random(seed)
+    blocked = bytearray(b"\x01" * (width * height))
+    blocked[0] = 0
+    stack = [(0, 0)]
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy) for dx, dy in _MAZE_STEPS
+                   if 0 <= x + dx < width and 0 <= y + dy < height
+                   and blocked[(y + dy) * width + x + dx]]
+        if not options:
+            stack.pop()
+            continue
+        next_x, next_y = rng.choice(options)
+        blocked[(y + next_y) // 2 * width + (x + next_x) // 2] = 0
+        blocked[next_y * width + next_x] = 0
+        stack.append((next_x, next_y))
+    return _finish(rng, width, height, blocked, weights, keep)
+
+
+def prim(width, height, seed=None, weights=(1,), keep=()):
+    """Grows a maze with the randomised Prim's algorithm. Its corridors are
+    short and branch a lot.
+
+    Args:
+        width, height: Size of the grid.
+
+        seed: Seed of the random generator, or None for a random one.
+
+        weights: Values the weights are picked from, uniformly.
+
+        keep: Indexes of cells left open.
+
+    Returns:
+        grid.Grid object.
+    """
+
+    rng = random.Random(seed)
+    blocked = bytearray(b"\x01" * (width * height))
+
+    def carve(x, y):
+        blocked[y * width + x] = 0
+        for dx, dy in _MAZE_STEPS:
+            if 0 <= x + dx < width and 0 <= y + dy < height:
+                walls.append((x, y, x + dx, y + dy))
+
+    walls = []
+    carve(0, 0)
+    while walls:
+        # Removes a random wall in constant time
+        index = rng.randrange(len(walls))
+        walls[index], walls[-1] = walls[-1], walls[index]
+        x, y, next_x, next_y = walls.pop()
+        if blocked[next_y * width + next_x]:
+            blocked[(y + next_y) // 2 * width + (x + next_x) // 2] = 0
+            carve(next_x, next_y)
+    return _finish(rng, width, height, blocked, weights, keep)
+
+
+def caves(width, height, density=0.45, steps=4, seed=None, weights=(1,),
+          keep=()):
+    """Smooths random noise into caves with a cellular automaton. At each
+    step, a cell becomes a wall if at least 5 cells of its 3x3 neighbourhood
+    are walls, counting the outside of the grid as walls.
+
+    The neighbourhoods of all cells are counted at once, by adding the
+    shifted rows of the grid as big integers, one byte per cell.
+
+    Args:
+        width, height: Size of the grid.
+
+        density: Fraction of the cells blocked in the noise.
+
+        steps: Number of steps of the automaton.
+
+        seed: Seed of the random generator, or None for a random one.
+
+        weights: Values the weights are picked from, uniformly.
+
+        keep: Indexes of cells left open.
+
+    Returns:
+        grid.Grid object.
+    """
+
+    rng = random.Random(seed)
+    noise = random_fill(width, height, density, rng.getrandbits(64)).blocked
+    if not noise:
+        return _finish(rng, width, height, noise, weights, keep)
+
+    # The grid with a border of walls, so that no row wraps onto the next
+    padded_width = width + 2
+    wall_row = b"\x01" * padded_width
+    cells = int.from_bytes(
+        wall_row
+        + b"".join(b"\x01" + noise[row * width:(row + 1) * width] + b"\x01"
+                   for row in range(height))
+        + wall_row, "little")
+    size = padded_width * (height + 2)
+    offsets = [8 * (dy * padded_width + dx)
+               for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+    border = cells & _border_mask(padded_width, height + 2)
+    walls = cells
+    for _ in range(steps):
+        # Each byte ends up counting the walls around its cell. The counts
+        # at the border are wrong, but they're replaced by walls below.
+        counts = 0
+        for offset in offsets:
+            counts += walls << offset if offset > 0 else walls >> -offset
+        walls = int.from_bytes(
+            (counts & ((1 << 8 * size) - 1)).to_bytes(size, "little")
+            .translate(_CAVE_WALL), "little")
+        walls |= border
+
+    padded = walls.to_bytes(size, "little")
+    blocked = bytearray(b"".join(
+        padded[row * padded_width + 1:row * padded_width + 1 + width]
+        for row in range(1, height + 1)))
+    return _finish(rng, width, height, blocked, weights, keep)
+
+
+def _border_mask(width, height):
+    """Big integer with the byte of each cell on the border of a grid set to
+    0xff.
+    """
+
+    row = b"\xff" + bytes(width - 2) + b"\xff"
+    return int.from_bytes(b"\xff" * width + row * (height - 2)
+                          + b"\xff" * width, "little")
+
+
+def _weights(rng, size, values):
+    """Picks size weights among values, using a single call of rng."""
+
+    if len(values) == 1 or not size:
+        return bytes([values[0]]) * size
+    table = bytes(values[byte * len(values) // 256] for byte in range(256))
+    return rng.getrandbits(8 * size).to_bytes(size, "little").translate(table)
+
+
+def _finish(rng, width, height, blocked, weights, keep):
+    for cell in keep:
+        blocked[cell] = 0
+    return Grid(width, height, blocked,
+                _weights(rng, width * height, weights))
+
+
+GENERATORS = {
+    "random_fill": random_fill,
+    "backtracker": backtracker,
+    "prim": prim,
+    "caves": caves,
+}
@@ -0,0 +1,93 @@
+"""results.py module
+
+What the solvers return, and helpers for building it.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class SearchResult:
+    """Outcome of a search.
+
+    Attributes:
+        found: Whether a path to the goal was found.
+
+        path: Indexes of the cells from the start to the goal, both included.
+              It's empty when no path was found, unless the search ran out
+              of its budget.
+
+        expanded: Number of cells expanded by the search.
+
+        cost: Sum of the weights of the cells entered along the path.
+
+        exhausted: Whether the search ran out of its budgets.Budget before
+                   finishing. Unless a path was found anyway, path then
+                   leads from the start to the cell expanded closest to the
+                   goal.
+
+        bound: For the searches that bound it, like weighted_astar, the
+               factor by which cost is at most the cost of the cheapest
+               path. None for the others.
+    """
+
+    found: bool
+    path: list = field(default_factory=list)
+    expanded: int = 0
+    cost: int = 0
+    exhausted: bool = False
+    bound: float = None
+
+
+def reconstruct_path(came_from, current):
+    """Produces the list of cells leading to current.
+
+    Args:
+        came_from: dict mapping each cell to the cell preceding it on the
+                   cheapest known path.
+
+        current: Last cell of the path.
+
+    Returns:
+        list object with the cell indexes from the start to current.
+    """
+
+    total_path = [current]
+    while current in came_from:
+        current = came_from[current]
+        total_path.append(current)
+    total_path.reverse()
+    return total_path
+
+
+def path_cost(grid, path):
+    """Sum of the weights of the cells entered along path."""
+
+    weights = grid.weights
+    return sum(weights[cell] for cell in path[1:])
+
+
+def exhausted(grid, path, expanded):
+    """Result of a search that ran out of its budget, with the partial path
+    it found.
+    """
+
+    return SearchResult(False, path, expanded, path_cost(grid, path), True)
+
+
+def run(steps):
+    """Runs a stepper to the end.
+
+    Args:
+        steps: Generator yielding after each cell expanded and returning a
+               SearchResult, like those of solvers.STEPPERS.
+
+    Returns:
+        The SearchResult object returned by steps.
+    """
+
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
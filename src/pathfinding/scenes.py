@@ -1,13 +1,18 @@
 """scenes.py module"""
 
-import random
+import itertools
+import os
 import sys
-from threading import Thread, active_count
 
 from basic_engine import scene, transition, interface
-from pygame import constants, image, time, transform
+from pygame import constants, display, image, mouse, time, transform
 
-from . import algorithms, cubes, languages, icon_path
+from . import algorithms, cubes, languages, maps, mazes, icon_path
+
+# Most time spent searching in each frame, so that fast searches don't slow
+# the application down
+SEARCH_SECONDS = 0.008
+MAX_SEARCH_SPEED = 4096
 
 
 class SplashScreenScene(scene.Scene):
@@ -52,11 +57,25 @@ class SplashScreenScene(scene.Scene):
 class ApplicationScene(scene.Scene):
     """Scene that renders all the application."""
 
-    def __init__(self, screen):
+    def __init__(self, screen, map_path=None):
+        """Initialise the object.
+
+        Args:
+            screen: pygame.surface.Surface object of the window.
+
+            map_path: Optional path of a map to open, in any format read by
+                      maps.open_map. Pressing F5 saves the terrain next to
+                      it, in the binary format.
+        """
+
         super().__init__(screen)
 
         self.traversing = False
         self.algorithm = None
+        # algorithms.Animation object of the search running, and the cells
+        # it expands in each frame. + and - change the speed.
+        self.search = None
+        self.search_speed = 2
 
         # This is going to be shown to the user. It's updated whenever
         # an algorithm begins searching
@@ -65,7 +84,15 @@ class ApplicationScene(scene.Scene):
         self.path_cost = 0
     
         self.cube = cubes.CharacterCube(screen)
-        self.paths = cubes.PathCubeList(screen)
+        self.generators = itertools.cycle(mazes.GENERATORS)
+        self.map_path = map_path
+        if map_path is None:
+            self.paths = cubes.PathCubeList(screen)
+        else:
+            grid_, start = maps.open_map(map_path)
+            self.paths = cubes.PathCubeList(screen, grid_)
+            if start is not None:
+                self.cube.move(self.paths[start])
 
         self.algorithms_button_bar = interface.ButtonBar(
             self.screen,
@@ -77,6 +104,19 @@ class ApplicationScene(scene.Scene):
                     algorithms.astar, languages.message_map["astar"]
                 ),
             ),
+            (
+                languages.message_map["weighted_astar"],
+                lambda: self.set_algorithm(
+                    algorithms.weighted_astar,
+                    languages.message_map["weighted_astar"]
+                ),
+            ),
+            (
+                languages.message_map["ara_star"],
+                lambda: self.set_algorithm(
+                    algorithms.ara_star, languages.message_map["ara_star"]
+                ),
+            ),
             (
                 languages.message_map["dijkstra"],
                 lambda: self.set_algorithm(
@@ -95,6 +135,38 @@ class ApplicationScene(scene.Scene):
                     algorithms.bfs, languages.message_map["bfs"]
                 ),
             ),
+            (
+                languages.message_map["jps"],
+                lambda: self.set_algorithm(
+                    algorithms.jps, languages.message_map["jps"]
+                ),
+            ),
+            (
+                languages.message_map["bidirectional_astar"],
+                lambda: self.set_algorithm(
+                    algorithms.bidirectional_astar,
+                    languages.message_map["bidirectional_astar"]
+                ),
+            ),
+            (
+                languages.message_map["bidirectional_dijkstra"],
+                lambda: self.set_algorithm(
+                    algorithms.bidirectional_dijkstra,
+                    languages.message_map["bidirectional_dijkstra"]
+                ),
+            ),
+            (
+                languages.message_map["dstar_lite"],
+                lambda: self.set_algorithm(
+                    algorithms.dstar_lite, languages.message_map["dstar_lite"]
+                ),
+            ),
+            (
+                languages.message_map["hpa"],
+                lambda: self.set_algorithm(
+                    algorithms.hpa, languages.message_map["hpa"]
+                ),
+            ),
             bar_surface_colour=(41, 67, 92),
             bar_outline_colour=(21, 42, 56),
         )
@@ -123,26 +195,112 @@ class ApplicationScene(scene.Scene):
         self.info_label.rect.bottom = self.screen_rect.bottom - 10
         self.info_label.rect.centerx = self.screen_rect.centerx
 
+        # What draw needs to know to only redraw what changed since the
+        # last frame.
+        self.bg_colour = (30, 30, 30)
+        self.redraw_all = True
+        self.labels_changed = False
+        self.pointer_moved = False
+        self.drawn_cube = None
+        self.drawn_labels = {}
+
     def draw(self) -> None:
-        self.screen.fill((30, 30, 30))
-        self.paths.draw()
-        self.cube.draw()
-        self.algorithms_button_bar.draw()
-        self.timer.draw()
-        self.label.draw()
-        self.info_label.draw()
+        bar = self.algorithms_button_bar
+        changed = self.paths.render()
+        labels = (self.timer, self.label, self.info_label)
+        cube_rect = self.paths.get_screen_rect(self.cube)
+
+        if self.redraw_all or bar.active:
+            # The open bar covers the grid, so it's simpler to draw it all
+            # until it's closed.
+            self.redraw_all = bar.active
+            self.labels_changed = self.pointer_moved = False
+            self.screen.fill(self.bg_colour)
+            self.screen.blit(self.paths.surface, self.paths.rect)
+            if cube_rect:
+                self.cube.draw(cube_rect)
+            bar.draw()
+            for label in labels:
+                label.draw()
+                self.drawn_labels[label] = label.rect.copy()
+            self.drawn_cube = cube_rect
+            display.update()
+            return
+
+        rects = [self.restore(area) for area in changed]
+        if cube_rect != self.drawn_cube:
+            rects.append(self.restore(self.drawn_cube))
+            rects.append(cube_rect)
+        # The chronometer changes on every frame while searching
+        if not (rects or self.labels_changed or self.traversing
+                or self.pointer_moved):
+            return
+
+        # The labels and the bar may overlap, so they are all drawn again, in
+        # the same order as when drawing everything.
+        self.labels_changed = False
+        for label in labels:
+            rects.append(self.restore(self.drawn_labels[label]))
+            rects.append(self.restore(label.rect))
+        # Out of view, the cube's rect is empty and collides with nothing,
+        # but it's still where the cube is drawn now
+        if cube_rect.collidelist(rects) != -1:
+            self.cube.draw(cube_rect)
+        self.drawn_cube = cube_rect
+        bar.draw()
+        for label in labels:
+            label.draw()
+            self.drawn_labels[label] = label.rect.copy()
+
+        if self.pointer_moved:
+            # The bar highlights its button under the pointer
+            self.pointer_moved = False
+            display.update()
+        else:
+            display.update(rects)
+
+    def restore(self, area):
+        """Draws the background and grid back over area of the screen.
+
+        Returns:
+            area, for convenience.
+        """
+
+        self.screen.fill(self.bg_colour, area)
+        on_grid = area.clip(self.paths.rect)
+        if on_grid:
+            self.screen.blit(self.paths.surface, on_grid,
+                             on_grid.move(-self.paths.rect.x,
+                                          -self.paths.rect.y))
+        return area
 
     def update(self) -> None:
         if not self.algorithms_button_bar.active:
             self.paths.update()
         self.algorithms_button_bar.update()
+        if self.search is not None:
+            if not self.traversing:
+                # The search was cancelled or its terrain reset
+                self.search.cancel()
+                self.search = None
+            elif self.search.update(self.search_speed, SEARCH_SECONDS):
+                self.finish_maze()
         self.timer.update()
         self.info_label.update()
 
     def update_on_event(self, event) -> None:
         if event.type == constants.QUIT:
             sys.exit()
+        elif event.type == constants.MOUSEMOTION:
+            self.pointer_moved = True
+            if event.buttons[1]:
+                # Dragging with the middle button pans the grid
+                self.paths.camera.pan(*event.rel)
+        elif (event.type == constants.MOUSEWHEEL
+              and self.paths.rect.collidepoint(mouse.get_pos())):
+            self.paths.camera.zoom(event.y, mouse.get_pos())
         elif event.type == constants.KEYDOWN:
+            column, row = self.paths.get_coords(self.cube.get_pos())
             if event.key == constants.K_r:
                 # Reset terrain and cube position
                 self.traversing = False
@@ -158,65 +316,87 @@ class ApplicationScene(scene.Scene):
                 self.timer.reset()
                 self.reset_alg_stats()
             elif event.key == constants.K_s and self.algorithm is not None:
-                if active_count() == 1 and self.paths.get_objective() is not None:
-                    Thread(
-                        target=lambda: self.solve_maze(self.algorithm),
-                        daemon=True,
-                    ).start()
+                if self.search is None and self.paths.get_objective() is not None:
+                    self.solve_maze(self.algorithm)
             elif event.key == constants.K_c and self.traversing:
                 self.traversing = False
                 self.paths.clean()
                 self.timer.reset()
                 self.reset_alg_stats()
             elif event.key == constants.K_g and not self.traversing:
-                self.paths.unblock_all()
-                percentage_to_block = 30/100
-                amount_to_block = int(len(self.paths) * percentage_to_block)
-                to_block = random.choices(
-                    list(
-                        filter(lambda p: not (p.get_pos() == self.cube.get_pos()),
-                               self.paths)), k=amount_to_block)
-                for p_to_block in to_block:
-                    p_to_block.block()
+                # Each press uses the next generator
+                generator = mazes.GENERATORS[next(self.generators)]
+                terrain = generator(
+                    self.paths.n_columns, self.paths.n_rows,
+                    weights=(1, 2, 3),
+                    keep=(self.paths.get_index(self.cube.get_pos()),))
+                self.paths.grid.fill(terrain.blocked, terrain.weights)
+            elif event.key == constants.K_F5:
+                self.save_map()
+            elif event.key == constants.K_HOME:
+                self.paths.camera.reset()
+            elif event.key == constants.K_RIGHTBRACKET:
+                self.paths.resize_brush(2)
+            elif event.key == constants.K_LEFTBRACKET:
+                self.paths.resize_brush(-2)
+            elif event.key in (constants.K_PLUS, constants.K_EQUALS,
+                               constants.K_KP_PLUS):
+                self.search_speed = min(self.search_speed * 2,
+                                        MAX_SEARCH_SPEED)
+            elif event.key in (constants.K_MINUS, constants.K_KP_MINUS):
+                self.search_speed = max(self.search_speed // 2, 1)
 
             # Computing the directions clicks.
-            elif (
-                event.key == constants.K_UP
-                and self.cube.rect.y > self.paths.HEIGHT_SPACING_FACTOR // 2
-            ):
+            elif event.key == constants.K_UP and row > 0:
                 self.cube.rect.y -= cubes.SIDE_LENGTH
-            elif (
-                event.key == constants.K_DOWN
-                and self.cube.rect.y < self.paths.grid_height + 20 # Bad workaround. height isn't reliable
-            ):
+            elif event.key == constants.K_DOWN and row < self.paths.n_rows - 1:
                 self.cube.rect.y += cubes.SIDE_LENGTH
-            elif (
-                event.key == constants.K_RIGHT
-                and self.cube.rect.x <= self.paths.grid_width + 40 # Bad workaround. width isn't reliable
-            ):
+            elif (event.key == constants.K_RIGHT
+                  and column < self.paths.n_columns - 1):
                 self.cube.rect.x += cubes.SIDE_LENGTH
-            elif (
-                event.key == constants.K_LEFT
-                and self.cube.rect.x > self.paths.WIDTH_SPACING_FACTOR // 2
-            ):
+            elif event.key == constants.K_LEFT and column > 0:
                 self.cube.rect.x -= cubes.SIDE_LENGTH
         self.algorithms_button_bar.update_on_event(event)
 
     def solve_maze(self, fn):
-        """Solve the user generated maze given the solver function.
+        """Start solving the user generated maze given the solver function.
+        The search is then advanced on each update.
 
         Args:
 
-            fn: Function to use to solve the maze.
-                Signature: fn(CharacterCube, PathCubeList)
+            fn: Function of the algorithms module to use to solve the maze.
+                Signature: fn(ApplicationScene, CharacterCube, PathCubeList)
         """
 
         self.traversing = True
         self.timer.start()
-        found, read_nodes_len, path_len, path_cost = fn(self, self.cube, self.paths)
-        self.info_label.update_text(languages.message_map["info_label"] % (read_nodes_len, path_len, path_cost))
+        self.search = algorithms.Animation(fn(self, self.cube, self.paths))
+
+    def finish_maze(self):
+        """Show the outcome of the search that just finished."""
+
+        found, read_nodes_len, path_len, path_cost, bound = self.search.result
+        self.search = None
+        if bound is None:
+            self.info_label.update_text(languages.message_map["info_label"] % (read_nodes_len, path_len, path_cost))
+        else:
+            # The path may not be the cheapest
+            self.info_label.update_text(languages.message_map["info_label_bound"] % (read_nodes_len, path_len, path_cost, bound))
         self.timer.stop()
         self.traversing = False
+        self.labels_changed = True
+
+    def save_map(self):
+        """Saves the terrain and the cube's position in the binary format,
+        replacing the map opened if it was in that format already.
+        """
+
+        if self.map_path is None:
+            file_path = "terrain" + maps.MAP_EXTENSION
+        else:
+            file_path = os.path.splitext(self.map_path)[0] + maps.MAP_EXTENSION
+        maps.save(file_path, self.paths.grid,
+                  self.paths.get_index(self.cube.get_pos()))
 
     def set_algorithm(self, new, name_new):
         self.label.update_text(
@@ -227,6 +407,7 @@ class ApplicationScene(scene.Scene):
         self.label.rect.x -= 10
         self.label.rect.y += 10
         self.algorithm = new
+        self.labels_changed = True
     
     def reset_alg_stats(self):
         """Reset information of algorithm after being ran."""
@@ -237,4 +418,5 @@ class ApplicationScene(scene.Scene):
         self.info_label.update_text(languages.message_map["info_label"] %
                                     (self.nodes_visited, self.path_len,
                                      self.path_cost))
+        self.labels_changed = True
 
@@ -0,0 +1,544 @@
+"""solvers.py module
+
+Headless implementations of the pathfinding algorithms. They work on
+grid.Grid objects, identify cells by their index and never sleep nor draw
+anything, so they can run at full speed outside of the application.
+
+Every algorithm is also available as a stepper, a generator yielding after
+each cell expanded and returning the SearchResult, so that a search can be
+advanced a few expansions at a time and interleaved with other work:
+
+    steps = solvers.steps(grid, start, goal, "astar")
+    for _ in itertools.islice(steps, 100):
+        ...
+
+The plain functions run their stepper to the end.
+"""
+
+from collections import deque
+
+from .heaps import BucketQueue, IndexedHeap
+from .anytime import ara_star, ara_star_steps
+from .hierarchical import hpa, hpa_steps
+from .incremental import dstar_lite, dstar_lite_steps
+from .jps import jps, jps_steps
+from .landmarks import LandmarkTable
+from .results import (SearchResult, exhausted, path_cost, reconstruct_path,
+                      run)
+
+# Heaviest cell weight for which A* and Dijkstra use a bucket queue
+BUCKET_QUEUE_MAX_WEIGHT = 16
+
+
+def _found(grid, came_from, goal, expanded, observer):
+    path = reconstruct_path(came_from, goal)
+    result = SearchResult(True, path, expanded, path_cost(grid, path))
+    if observer is not None:
+        observer.path_found(path, result.cost)
+    return result
+
+
+def _open_set(grid, heuristic_step):
+    """Chooses the queue of a best-first search.
+
+    When every weight is a small positive integer, which is always the case
+    in the application, f is a small integer too and a bucket queue
+    beats a binary heap.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        heuristic_step: Most the heuristic can change between neighbours,
+                        or None if the heuristic isn't consistent, since
+                        priorities popped from a bucket queue can't
+                        decrease.
+
+    Returns:
+        heaps.BucketQueue or heaps.IndexedHeap object.
+    """
+
+    weight_range = grid.weight_range()
+    if heuristic_step is not None and weight_range is not None:
+        lightest, heaviest = weight_range
+        if lightest >= 1 and heaviest <= BUCKET_QUEUE_MAX_WEIGHT:
+            return BucketQueue(heaviest + heuristic_step)
+    return IndexedHeap()
+
+
+def _best_first_steps(grid, start, goal, heuristic, heuristic_step,
+                      observer, budget):
+    """Best-first search shared by A* and Dijkstra.
+
+    Cells are queued once. Finding a cheaper path to a queued cell decreases
+    its priority in place. The priority is (f, h), so ties prefer cells
+    closer to the goal and are always broken in the same way, whichever
+    queue _open_set chooses.
+    """
+
+    weights = grid.weights
+    g_score = {start: 0}
+    came_from = {}
+    open_set = _open_set(grid, heuristic_step)
+    h = heuristic(start)
+    open_set.push(start, (h, h))
+    if observer is not None:
+        observer.open_set(open_set)
+        observer.push(start, 0)
+    expanded = 0
+    deadline = None if budget is None else budget.deadline()
+    closest, closest_h = start, float("inf")
+
+    while open_set:
+        _, current = open_set.pop()
+        if observer is not None:
+            observer.pop(current)
+        if current == goal:
+            return _found(grid, came_from, current, expanded, observer)
+
+        if budget is not None:
+            if budget.exhausted(deadline, expanded, len(g_score)):
+                return exhausted(grid, reconstruct_path(came_from, closest),
+                                 expanded)
+            h = grid.manhattan(current, goal)
+            if h < closest_h:
+                closest, closest_h = current, h
+
+        expanded += 1
+        current_g = g_score[current]
+        for neighbour in grid.neighbours(current):
+            tentative_g = current_g + weights[neighbour]
+            if tentative_g < g_score.get(neighbour, float("inf")):
+                if observer is not None:
+                    if neighbour in g_score:
+                        observer.relax(neighbour, tentative_g)
+                    else:
+                        observer.push(neighbour, tentative_g)
+                came_from[neighbour] = current
+                g_score[neighbour] = tentative_g
+                h = heuristic(neighbour)
+                f = tentative_g + h
+                open_set.push(neighbour, (f, h))
+
+        if observer is not None:
+            observer.close(current)
+        yield
+
+    return SearchResult(False, expanded=expanded)
+
+
+def astar_steps(grid, start, goal, observer=None, budget=None):
+    """Stepper of astar."""
+
+    return _best_first_steps(grid, start, goal,
+                             lambda cell: grid.manhattan(cell, goal), 1,
+                             observer, budget)
+
+
+def dijkstra_steps(grid, start, goal, observer=None, budget=None):
+    """Stepper of dijkstra."""
+
+    return _best_first_steps(grid, start, goal, lambda cell: 0, 0, observer,
+                             budget)
+
+
+def weighted_astar_steps(grid, start, goal, observer=None, epsilon=1.5,
+                         budget=None):
+    """Stepper of weighted_astar."""
+
+    if epsilon < 1:
+        raise ValueError("epsilon must be at least 1")
+    result = yield from _best_first_steps(
+        grid, start, goal, lambda cell: epsilon * grid.manhattan(cell, goal),
+        None, observer, budget)
+    if result.found:
+        result.bound = epsilon
+    return result
+
+
+def astar(grid, start, goal, observer=None, budget=None):
+    """A* algorithm using the manhattan distance as heuristic.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        start: Index of the cell where the search begins.
+
+        goal: Index of the cell to reach.
+
+        observer: Optional events.Observer object told about the progress
+                  of the search.
+
+        budget: Optional budgets.Budget object limiting the search.
+
+    Returns:
+        SearchResult object.
+    """
+
+    return run(astar_steps(grid, start, goal, observer, budget))
+
+
+def weighted_astar(grid, start, goal, observer=None, epsilon=1.5,
+                   budget=None):
+    """A* with the heuristic multiplied by epsilon. It expands fewer cells
+    than astar, all the fewer as epsilon grows, and the path found costs at
+    most epsilon times the cheapest. Takes the same arguments as astar.
+
+    Args:
+        epsilon: Factor of the heuristic, at least 1, which is astar.
+
+    Raises:
+        ValueError: If epsilon is less than 1.
+    """
+
+    return run(weighted_astar_steps(grid, start, goal, observer, epsilon,
+                                    budget))
+
+
+def alt_steps(grid, start, goal, observer=None, landmarks=None, budget=None):
+    """Stepper of alt. Building the landmark table, when it's not given, is
+    done at once.
+    """
+
+    if landmarks is None:
+        landmarks = LandmarkTable(grid)
+    elif not landmarks.matches(grid):
+        raise ValueError("The landmark table was built for another terrain")
+    # Between neighbours, the heuristic changes by at most a cell's weight,
+    # which a bucket queue is only used for up to BUCKET_QUEUE_MAX_WEIGHT
+    return _best_first_steps(grid, start, goal,
+                             landmarks.heuristic(grid, goal),
+                             BUCKET_QUEUE_MAX_WEIGHT, observer, budget)
+
+
+def alt(grid, start, goal, observer=None, landmarks=None, budget=None):
+    """A* with the ALT heuristic, which accounts for walls and weights.
+    Finds the same path costs as astar, usually expanding far fewer cells on
+    mazes and weighted grids. Takes the same arguments as astar.
+
+    Args:
+        landmarks: Optional landmarks.LandmarkTable object built from grid.
+                   Without it, one is built for this search only, which
+                   costs much more than the search.
+
+    Raises:
+        ValueError: If landmarks was built from another terrain, including
+                    grid before its cells were last edited.
+    """
+
+    return run(alt_steps(grid, start, goal, observer, landmarks, budget))
+
+
+def dijkstra(grid, start, goal, observer=None, budget=None):
+    """Dijkstra's algorithm. Takes the same arguments as astar."""
+
+    return run(dijkstra_steps(grid, start, goal, observer, budget))
+
+
+def _bidirectional_steps(grid, start, goal, forward_h, backward_h, observer,
+                         budget):
+    """Searches from start and from goal at once until both searches meet.
+
+    Both use the average potential (forward_h - backward_h) / 2, which is
+    consistent in both directions whenever the two heuristics are, so each
+    side works like Dijkstra's algorithm on costs reduced by the potential.
+    Keys are doubled to keep them integers. The search stops once the two
+    smallest keys add up to twice the cheapest path seen between the sides.
+
+    Moving onto a cell costs its weight, so going backwards from a cell to
+    its neighbour costs the weight of the cell being left.
+
+    A partial path, when the budget runs out, only comes from the forward
+    side.
+    """
+
+    if start == goal:
+        if observer is not None:
+            observer.path_found([start], 0)
+        return SearchResult(True, [start], 0, 0)
+
+    weights = grid.weights
+
+    def potential(cell):
+        return forward_h(cell) - backward_h(cell)
+
+    # Everything below is indexed by side: 0 is forward, 1 is backward.
+    g_score = ({start: 0}, {goal: 0})
+    came_from = ({}, {})
+    open_sets = (IndexedHeap(), IndexedHeap())
+    open_sets[0].push(start, potential(start))
+    open_sets[1].push(goal, -potential(goal))
+    if observer is not None:
+        observer.open_set(open_sets[0])
+        observer.open_set(open_sets[1])
+        observer.push(start, 0)
+        observer.push(goal, 0)
+    best_cost = float("inf")
+    meeting = None
+    expanded = 0
+    deadline = None if budget is None else budget.deadline()
+    closest, closest_h = start, float("inf")
+
+    while open_sets[0] and open_sets[1]:
+        if open_sets[0].peek()[0] + open_sets[1].peek()[0] >= 2 * best_cost:
+            break
+        if budget is not None and budget.exhausted(
+                deadline, expanded, len(g_score[0]) + len(g_score[1])):
+            return exhausted(grid, reconstruct_path(came_from[0], closest),
+                             expanded)
+
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        sign = 1 if side == 0 else -1
+        own_g, other_g = g_score[side], g_score[1 - side]
+        _, current = open_sets[side].pop()
+        if observer is not None:
+            observer.pop(current)
+        expanded += 1
+        if budget is not None and side == 0:
+            h = grid.manhattan(current, goal)
+            if h < closest_h:
+                closest, closest_h = current, h
+
+        current_g = own_g[current]
+        for neighbour in grid.neighbours(current):
+            step = weights[neighbour] if side == 0 else weights[current]
+            tentative_g = current_g + step
+            if tentative_g < own_g.get(neighbour, float("inf")):
+                if observer is not None:
+                    if neighbour in own_g:
+                        observer.relax(neighbour, tentative_g)
+                    else:
+                        observer.push(neighbour, tentative_g)
+                own_g[neighbour] = tentative_g
+                came_from[side][neighbour] = current
+                open_sets[side].push(neighbour,
+                                     2 * tentative_g + sign * potential(neighbour))
+
+                if neighbour in other_g:
+                    cost = tentative_g + other_g[neighbour]
+                    if cost < best_cost:
+                        best_cost, meeting = cost, neighbour
+
+        if observer is not None:
+            observer.close(current)
+        yield
+
+    if meeting is None:
+        return SearchResult(False, expanded=expanded)
+
+    path = reconstruct_path(came_from[0], meeting)
+    current = meeting
+    while current in came_from[1]:
+        current = came_from[1][current]
+        path.append(current)
+    if observer is not None:
+        observer.path_found(path, best_cost)
+    return SearchResult(True, path, expanded, best_cost)
+
+
+def bidirectional_astar_steps(grid, start, goal, observer=None, budget=None):
+    """Stepper of bidirectional_astar."""
+
+    return _bidirectional_steps(grid, start, goal,
+                                lambda cell: grid.manhattan(cell, goal),
+                                lambda cell: grid.manhattan(cell, start),
+                                observer, budget)
+
+
+def bidirectional_dijkstra_steps(grid, start, goal, observer=None,
+                                 budget=None):
+    """Stepper of bidirectional_dijkstra."""
+
+    return _bidirectional_steps(grid, start, goal, lambda cell: 0,
+                                lambda cell: 0, observer, budget)
+
+
+def bidirectional_astar(grid, start, goal, observer=None, budget=None):
+    """A* searching from both ends. Takes the same arguments as astar."""
+
+    return run(bidirectional_astar_steps(grid, start, goal, observer, budget))
+
+
+def bidirectional_dijkstra(grid, start, goal, observer=None, budget=None):
+    """Dijkstra's algorithm searching from both ends. Takes the same
+    arguments as astar.
+    """
+
+    return run(bidirectional_dijkstra_steps(grid, start, goal, observer,
+                                            budget))
+
+
+def bfs(grid, start, goal, observer=None, budget=None):
+    """Breadth-first search. Takes the same arguments as astar.
+
+    The path found has the fewest cells, but weights are ignored.
+    """
+
+    return run(bfs_steps(grid, start, goal, observer, budget))
+
+
+def bfs_steps(grid, start, goal, observer=None, budget=None):
+    """Stepper of bfs."""
+
+    came_from = {}
+    discovered = {start}
+    queue = deque((start,))
+    if observer is not None:
+        observer.push(start, 0)
+    expanded = 0
+    deadline = None if budget is None else budget.deadline()
+    closest, closest_h = start, float("inf")
+
+    while queue:
+        current = queue.popleft()
+        if observer is not None:
+            observer.pop(current)
+        if current == goal:
+            return _found(grid, came_from, current, expanded, observer)
+
+        if budget is not None:
+            if budget.exhausted(deadline, expanded, len(discovered)):
+                return exhausted(grid, reconstruct_path(came_from, closest),
+                                 expanded)
+            h = grid.manhattan(current, goal)
+            if h < closest_h:
+                closest, closest_h = current, h
+
+        expanded += 1
+        for neighbour in grid.neighbours(current):
+            if neighbour not in discovered:
+                discovered.add(neighbour)
+                came_from[neighbour] = current
+                queue.append(neighbour)
+                if observer is not None:
+                    observer.push(neighbour, 0)
+
+        if observer is not None:
+            observer.close(current)
+        yield
+
+    return SearchResult(False, expanded=expanded)
+
+
+def dfs(grid, start, goal, observer=None, budget=None):
+    """Depth-first search. Takes the same arguments as astar.
+
+    Finds a path, but usually not a short one.
+    """
+
+    return run(dfs_steps(grid, start, goal, observer, budget))
+
+
+def dfs_steps(grid, start, goal, observer=None, budget=None):
+    """Stepper of dfs."""
+
+    came_from = {}
+    visited = set()
+    stack = [start]
+    if observer is not None:
+        observer.push(start, 0)
+    deadline = None if budget is None else budget.deadline()
+    closest, closest_h = start, float("inf")
+
+    while stack:
+        current = stack.pop()
+        if current in visited:
+            continue
+        if observer is not None:
+            observer.pop(current)
+        if current == goal:
+            return _found(grid, came_from, current, len(visited), observer)
+
+        if budget is not None:
+            if budget.exhausted(deadline, len(visited),
+                                len(came_from) + len(stack)):
+                return exhausted(grid, reconstruct_path(came_from, closest),
+                                 len(visited))
+            h = grid.manhattan(current, goal)
+            if h < closest_h:
+                closest, closest_h = current, h
+
+        visited.add(current)
+        for neighbour in grid.neighbours(current):
+            if neighbour not in visited:
+                came_from[neighbour] = current
+                stack.append(neighbour)
+                if observer is not None:
+                    observer.push(neighbour, 0)
+
+        if observer is not None:
+            observer.close(current)
+        yield
+
+    return SearchResult(False, expanded=len(visited))
+
+
+ALGORITHMS = {
+    "astar": astar,
+    "weighted_astar": weighted_astar,
+    "ara_star": ara_star,
+    "alt": alt,
+    "dijkstra": dijkstra,
+    "bfs": bfs,
+    "dfs": dfs,
+    "jps": jps,
+    "bidirectional_astar": bidirectional_astar,
+    "bidirectional_dijkstra": bidirectional_dijkstra,
+    "dstar_lite": dstar_lite,
+    "hpa": hpa,
+}
+
+STEPPERS = {
+    "astar": astar_steps,
+    "weighted_astar": weighted_astar_steps,
+    "ara_star": ara_star_steps,
+    "alt": alt_steps,
+    "dijkstra": dijkstra_steps,
+    "bfs": bfs_steps,
+    "dfs": dfs_steps,
+    "jps": jps_steps,
+    "bidirectional_astar": bidirectional_astar_steps,
+    "bidirectional_dijkstra": bidirectional_dijkstra_steps,
+    "dstar_lite": dstar_lite_steps,
+    "hpa": hpa_steps,
+}
+
+
+def solve(grid, start, goal, algorithm="astar", **options):
+    """Runs the algorithm registered under the given name.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        start: Index of the cell where the search begins.
+
+        goal: Index of the cell to reach.
+
+        algorithm: Key of ALGORITHMS.
+
+        options: Extra keyword arguments given to the algorithm.
+
+    Returns:
+        SearchResult object.
+    """
+
+    try:
+        solver = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}") from None
+    return solver(grid, start, goal, **options)
+
+
+def steps(grid, start, goal, algorithm="astar", **options):
+    """Creates the stepper of the algorithm registered under the given name.
+    Takes the same arguments as solve.
+
+    Returns:
+        Generator yielding None after each cell expanded and returning the
+        SearchResult object.
+    """
+
+    try:
+        stepper = STEPPERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}") from None
+    return stepper(grid, start, goal, **options)
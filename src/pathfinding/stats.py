@@ -0,0 +1,229 @@
+"""stats.py module
+
+Measurements of single searches, to find out where the time goes.
+
+measure runs any solver with a metering observer and a metered view of the
+grid, and returns a SearchStats object along with the result. Stats can be
+appended to a JSON lines file, one search per line, to be analysed later.
+"""
+
+import cProfile
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+from . import events, solvers
+
+
+@dataclass
+class SearchStats:
+    """Measurements of a search.
+
+    Attributes:
+        algorithm: Name of the solver.
+
+        width, height: Size of the grid searched.
+
+        start, goal: Cells searched between.
+
+        found, path_len, cost: Outcome of the search.
+
+        exhausted: Whether the search ran out of its budget.
+
+        expanded: Number of cells expanded.
+
+        pushes: Number of entries added to the open set, relaxations
+                included.
+
+        pops: Number of cells popped from the open set to be expanded.
+
+        stale_pops: Number of outdated entries the open set popped and
+                    skipped, as counted by the queue itself. Only
+                    heaps.BucketQueue leaves such entries behind.
+
+        peak_open: Largest number of cells in the open set at once.
+
+        manhattan_calls: Number of calls to Grid.manhattan. Every
+                         heuristic is made of it, but some solvers also
+                         call it to track the cell closest to the goal or
+                         to bound the cost of their path.
+
+        neighbour_seconds: Time spent in Grid.neighbours. Solvers reading
+                           the grid arrays themselves, like jps, don't
+                           call it.
+
+        seconds: Wall time of the whole search. Metering slows searches
+                 down, so compare it with other metered searches only.
+
+        peak_memory: Peak of the memory allocated, in bytes, if measured.
+    """
+
+    algorithm: str
+    width: int
+    height: int
+    start: int
+    goal: int
+    found: bool = False
+    exhausted: bool = False
+    path_len: int = 0
+    cost: int = 0
+    expanded: int = 0
+    pushes: int = 0
+    pops: int = 0
+    stale_pops: int = 0
+    peak_open: int = 0
+    manhattan_calls: int = 0
+    neighbour_seconds: float = 0.0
+    seconds: float = 0.0
+    peak_memory: int = None
+
+    def to_json(self):
+        """Gets the stats as a single line of JSON."""
+
+        return json.dumps(asdict(self))
+
+
+def write_jsonl(file_path, stats):
+    """Appends stats to a JSON lines file.
+
+    Args:
+        file_path: Path of the file.
+
+        stats: Iterable of SearchStats objects.
+    """
+
+    with open(file_path, "a") as file:
+        for item in stats:
+            file.write(item.to_json() + "\n")
+
+
+class _MeteringObserver(events.Observer):
+    """Counts the open set operations, then forwards the events."""
+
+    def __init__(self, stats, forward=None):
+        self.stats = stats
+        self.forward = forward
+        self.queued = set()
+        self.open_sets = []
+
+    def open_set(self, queue):
+        self.open_sets.append(queue)
+        if self.forward is not None:
+            self.forward.open_set(queue)
+
+    def push(self, cell, g):
+        self.stats.pushes += 1
+        self.queued.add(cell)
+        self.stats.peak_open = max(self.stats.peak_open, len(self.queued))
+        if self.forward is not None:
+            self.forward.push(cell, g)
+
+    def relax(self, cell, g):
+        self.stats.pushes += 1
+        if self.forward is not None:
+            self.forward.relax(cell, g)
+
+    def pop(self, cell):
+        self.stats.pops += 1
+        self.queued.discard(cell)
+        if self.forward is not None:
+            self.forward.pop(cell)
+
+    def close(self, cell):
+        if self.forward is not None:
+            self.forward.close(cell)
+
+    def path_found(self, path, cost):
+        if self.forward is not None:
+            self.forward.path_found(path, cost)
+
+
+class _MeteredGrid:
+    """View of a grid.Grid timing neighbour lookups and counting distance
+    computations. Everything else is read from the grid itself.
+    """
+
+    def __init__(self, grid, stats):
+        self._grid = grid
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._grid, name)
+
+    def __len__(self):
+        return len(self._grid)
+
+    def neighbours(self, index):
+        started = time.perf_counter()
+        result = self._grid.neighbours(index)
+        self._stats.neighbour_seconds += time.perf_counter() - started
+        return result
+
+    def manhattan(self, index, other):
+        self._stats.manhattan_calls += 1
+        return self._grid.manhattan(index, other)
+
+
+def measure(grid, start, goal, algorithm="astar", observer=None,
+            memory=False, profile=None, **options):
+    """Runs a search and measures it.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        start: Index of the cell where the search begins.
+
+        goal: Index of the cell to reach.
+
+        algorithm: Key of solvers.ALGORITHMS, or a solver function.
+
+        observer: Optional events.Observer object also told about the
+                  progress of the search.
+
+        memory: Whether to trace the peak memory with tracemalloc, which
+                slows the search down.
+
+        profile: Optional path of a file where cProfile statistics of the
+                 search are dumped, for pstats or snakeviz.
+
+        options: Extra keyword arguments given to the solver.
+
+    Returns:
+        A tuple (result, stats) with the SearchResult and SearchStats
+        objects.
+    """
+
+    if callable(algorithm):
+        solver, name = algorithm, algorithm.__name__
+    else:
+        solver, name = solvers.ALGORITHMS[algorithm], algorithm
+
+    stats = SearchStats(name, grid.width, grid.height, start, goal)
+    metered = _MeteredGrid(grid, stats)
+    metering = _MeteringObserver(stats, observer)
+    profiler = cProfile.Profile() if profile else None
+
+    if memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    started = time.perf_counter()
+    try:
+        result = solver(metered, start, goal, observer=metering, **options)
+    finally:
+        stats.seconds = time.perf_counter() - started
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if memory:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    stats.found = result.found
+    stats.exhausted = result.exhausted
+    stats.path_len = len(result.path)
+    stats.cost = result.cost
+    stats.expanded = result.expanded
+    stats.stale_pops = sum(queue.stale_pops for queue in metering.open_sets)
+    return result, stats
@@ -0,0 +1,144 @@
+"""viewport.py module
+
+Camera over a grid that may be larger than the area where it's drawn.
+
+A Viewport maps the cells of a grid to the pixels of an area of the screen,
+for a zoom and an offset chosen by the user. Below one pixel per cell, only
+one cell out of every few in each direction is drawn, so the number of cells
+drawn in a frame depends on the size of the area and not of the grid.
+"""
+
+from pygame import rect
+
+# Pixels per cell the zoom goes through
+ZOOM_LEVELS = (1 / 8, 1 / 4, 1 / 2, 1, 2, 3, 5, 8, 12, 20, 30, 40)
+
+
+class Viewport:
+    """Pan and zoom of a grid drawn on an area of the screen.
+
+    Attributes:
+        rect: pygame.rect.Rect object of the area of the screen.
+
+        columns, rows: Size of the grid.
+
+        cell_size: Pixels per cell, one of ZOOM_LEVELS.
+
+        x, y: Offset in pixels of the area from the top left corner of the
+              grid, at the current zoom.
+    """
+
+    def __init__(self, area, columns, rows, cell_size=20):
+        """Initialise the object.
+
+        Args:
+            area: pygame.rect.Rect object of the area of the screen.
+
+            columns, rows: Size of the grid.
+
+            cell_size: Pixels per cell to start with and to go back to on
+                       reset. It must be one of ZOOM_LEVELS.
+        """
+
+        self.rect = area
+        self.columns = columns
+        self.rows = rows
+        self.default_cell_size = cell_size
+        self.reset()
+
+    def reset(self):
+        """Goes back to the default zoom, with the grid at the top left."""
+
+        self.cell_size = self.default_cell_size
+        self.x = self.y = 0
+
+    @property
+    def stride(self):
+        """One cell out of this many, in each direction, is drawn."""
+
+        return round(1 / self.cell_size) if self.cell_size < 1 else 1
+
+    @property
+    def scale(self):
+        """Side in pixels of each cell drawn."""
+
+        return max(int(self.cell_size), 1)
+
+    @property
+    def key(self):
+        """Hashable value changing whenever the camera moves."""
+
+        return self.cell_size, self.x, self.y
+
+    def cell_at(self, pos):
+        """Gets the cell drawn at a position on the screen.
+
+        Args:
+            pos: tuple containing the x and y coordinates.
+
+        Returns:
+            A tuple (column, row). It might be outside of the grid.
+        """
+
+        return ((pos[0] - self.rect.x + self.x) // self.scale * self.stride,
+                (pos[1] - self.rect.y + self.y) // self.scale * self.stride)
+
+    def cell_rect(self, column, row):
+        """Gets the pygame.rect.Rect object of the screen where a cell is
+        drawn. Cells between those drawn when zoomed out share their rect.
+        """
+
+        scale, stride = self.scale, self.stride
+        return rect.Rect(self.rect.x + column // stride * scale - self.x,
+                         self.rect.y + row // stride * scale - self.y,
+                         scale, scale)
+
+    def visible(self):
+        """Gets the cells in view.
+
+        Returns:
+            A tuple (left, top, right, bottom) with the first columns and
+            rows in view and the ones past the last. left and top are
+            multiples of stride.
+        """
+
+        scale, stride = self.scale, self.stride
+        return (max(self.x // scale * stride, 0),
+                max(self.y // scale * stride, 0),
+                min(((self.x + self.rect.width - 1) // scale + 1) * stride,
+                    self.columns),
+                min(((self.y + self.rect.height - 1) // scale + 1) * stride,
+                    self.rows))
+
+    def pan(self, dx, dy):
+        """Moves the grid by some pixels, keeping part of it in view."""
+
+        width = -(-self.columns // self.stride) * self.scale
+        height = -(-self.rows // self.stride) * self.scale
+        half_width, half_height = self.rect.width // 2, self.rect.height // 2
+        self.x = min(max(self.x - dx, -half_width), width - half_width)
+        self.y = min(max(self.y - dy, -half_height), height - half_height)
+
+    def zoom(self, steps, pos=None):
+        """Zooms in or out through ZOOM_LEVELS.
+
+        Args:
+            steps: Number of levels to zoom in, or out if negative.
+
+            pos: Optional position on the screen that stays over the same
+                 cell. Defaults to the centre of the area.
+        """
+
+        level = ZOOM_LEVELS.index(self.cell_size)
+        level = min(max(level + steps, 0), len(ZOOM_LEVELS) - 1)
+        if pos is None:
+            pos = self.rect.center
+        offset_x, offset_y = pos[0] - self.rect.x, pos[1] - self.rect.y
+        # Position of pos in cells, which doesn't depend on the zoom
+        column = (offset_x + self.x) / self.scale * self.stride
+        row = (offset_y + self.y) / self.scale * self.stride
+
+        self.cell_size = ZOOM_LEVELS[level]
+        self.x = round(column / self.stride * self.scale) - offset_x
+        self.y = round(row / self.stride * self.scale) - offset_y
+        self.pan(0, 0)
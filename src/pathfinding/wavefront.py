@@ -0,0 +1,225 @@
+"""wavefront.py module
+
+Frontier-at-a-time breadth-first search. Sets of cells are kept as bitboards,
+Python integers where bit i stands for the cell of index i, so a whole BFS
+layer is expanded with a handful of big integer operations instead of one
+Python iteration per cell.
+
+The distance of each cell is recorded in bit planes: plane k holds the cells
+whose distance has bit k set. That needs log2(depth) integers instead of one
+per layer.
+"""
+
+from array import array
+
+from . import grid as grid_module
+from .results import SearchResult, path_cost
+
+# Maps a byte to the 8 bytes (0 or 1) of its bits, least significant first
+_BYTE_BITS = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+
+# Translates a blocked array into the digits of the open bitboard
+_OPEN_DIGITS = bytes([ord("1")]) + bytes([ord("0")]) * 255
+
+
+def _column_mask(width, height, column):
+    """Bitboard with every cell of the grid but the ones in column."""
+
+    row = ((1 << width) - 1) ^ (1 << column)
+    mask, filled = row, width
+    size = width * height
+    while filled < size:
+        mask |= mask << filled
+        filled *= 2
+    return mask & ((1 << size) - 1)
+
+
+def open_bitboard(grid):
+    """Creates the bitboard of the unblocked cells of grid."""
+
+    # Copied, as the flags may be a memoryview, like in grids mapped by
+    # maps.load
+    digits = bytearray(grid.blocked).translate(_OPEN_DIGITS)
+    digits.reverse()
+    return int(digits, 2)
+
+
+def to_bytes(bitboard, size):
+    """Expands a bitboard into a bytearray with one 0 or 1 byte per cell."""
+
+    packed = bitboard.to_bytes((size + 7) // 8, "little")
+    cells = bytearray(b"".join([_BYTE_BITS[byte] for byte in packed]))
+    del cells[size:]
+    return cells
+
+
+def _popcount(bitboard):
+    return bin(bitboard).count("1")
+
+
+def _expand(grid, start, goal=None):
+    """Runs the wavefront from start.
+
+    Args:
+        grid: grid.Grid object.
+
+        start: Index of the first cell.
+
+        goal: Optional index of a cell where the expansion stops.
+
+    Returns:
+        A tuple (visited, last_layer, planes, depth), where visited is the
+        bitboard of the cells reached, last_layer the bitboard of the cells
+        reached last, planes the distance bit planes and depth the distance
+        of the last layer.
+    """
+
+    width = grid.width
+    passable = open_bitboard(grid)
+    # Shifting one cell left or right wraps around rows, so those shifts are
+    # masked to drop the column the wrapped bits land on.
+    not_last = _column_mask(width, grid.height, width - 1)
+    not_first = _column_mask(width, grid.height, 0)
+
+    frontier = 1 << start
+    unvisited = passable & ~frontier
+    goal_bit = 0 if goal is None else 1 << goal
+    depth = 0
+
+    # Plane k is made of the runs of layers where bit k of the depth is set.
+    # Each run is added at once as the cells that stopped being unvisited
+    # while it lasted, so planes cost about two operations per layer.
+    planes = []
+    run_starts = []
+
+    while not frontier & goal_bit:
+        reached = ((frontier >> width | frontier << width
+                    | (frontier >> 1) & not_last
+                    | (frontier << 1) & not_first) & unvisited)
+        if not reached:
+            break
+
+        depth += 1
+        lowest = (depth & -depth).bit_length() - 1
+        if lowest == len(planes):
+            planes.append(0)
+            run_starts.append(None)
+        run_starts[lowest] = unvisited
+
+        frontier = reached
+        unvisited ^= reached
+
+        k = 0
+        while depth >> k & 1:
+            planes[k] |= run_starts[k] ^ unvisited
+            run_starts[k] = None
+            k += 1
+
+    for k, run_start in enumerate(run_starts):
+        if run_start is not None:
+            planes[k] |= run_start ^ unvisited
+
+    visited = (passable ^ unvisited) | 1 << start
+    return visited, frontier, planes, depth
+
+
+def reachable(grid, start):
+    """Flood fills the grid from start.
+
+    Args:
+        grid: grid.Grid object.
+
+        start: Index of the first cell.
+
+    Returns:
+        bytearray object with 1 for every cell reachable from start and 0
+        elsewhere.
+    """
+
+    visited, _, _, _ = _expand(grid, start)
+    return to_bytes(visited, len(grid))
+
+
+def distance_field(grid, start):
+    """Computes the number of moves from start to every cell.
+
+    Args:
+        grid: grid.Grid object.
+
+        start: Index of the first cell.
+
+    Returns:
+        array.array object of ints with one distance per cell. Unreachable
+        cells hold -1.
+    """
+
+    visited, _, planes, _ = _expand(grid, start)
+    size = len(grid)
+
+    if grid_module.numpy is not None:
+        numpy = grid_module.numpy
+        field = numpy.zeros(size, dtype=numpy.intc)
+        for k, plane in enumerate(planes):
+            field |= numpy.frombuffer(to_bytes(plane, size),
+                                      dtype=numpy.uint8).astype(numpy.intc) << k
+        field[numpy.frombuffer(to_bytes(visited, size),
+                               dtype=numpy.uint8) == 0] = -1
+        return array("i", field.tobytes())
+
+    planes = [to_bytes(plane, size) for plane in planes]
+    field = array("i", bytes(4 * size))
+    for cell, is_reached in enumerate(to_bytes(visited, size)):
+        if not is_reached:
+            field[cell] = -1
+            continue
+        distance = 0
+        for k, plane in enumerate(planes):
+            distance |= plane[cell] << k
+        field[cell] = distance
+    return field
+
+
+def bfs(grid, start, goal):
+    """Breadth-first search expanding a whole layer at a time.
+
+    Weights are ignored, like in solvers.bfs.
+
+    Args:
+        grid: grid.Grid object to search on.
+
+        start: Index of the cell where the search begins.
+
+        goal: Index of the cell to reach.
+
+    Returns:
+        results.SearchResult object. expanded counts the cells closer to
+        start than goal.
+    """
+
+    visited, last_layer, planes, depth = _expand(grid, start, goal)
+    if not visited >> goal & 1:
+        return SearchResult(False, expanded=_popcount(visited))
+    expanded = _popcount(visited ^ last_layer)
+
+    # Walks back from goal, stepping onto any neighbour one move closer to
+    # start. The distance of a cell is read from the bit planes.
+    size = len(grid)
+    visited = to_bytes(visited, size)
+    planes = [to_bytes(plane, size) for plane in planes]
+
+    def distance(cell):
+        result = 0
+        for k, plane in enumerate(planes):
+            result |= plane[cell] << k
+        return result
+
+    path = [goal]
+    current = goal
+    for remaining in range(depth - 1, -1, -1):
+        for neighbour in grid.neighbours(current):
+            if visited[neighbour] and distance(neighbour) == remaining:
+                current = neighbour
+                break
+        path.append(current)
+    path.reverse()
+    return SearchResult(True, path, expanded, path_cost(grid, path))
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from pathfinding import solvers
+from pathfinding.anytime import ARAStar
+from pathfinding.budgets import Budget
+from pathfinding.grid import Grid
+from pathfinding.results import run
+
+
+def _rough_grid():
+    """40x40 grid of random weights and walls, open at both corners."""
+
+    rng = random.Random(24)
+    grid = Grid(40, 40, [rng.random() < 0.2 for _ in range(1600)],
+                [rng.choice((1, 1, 2, 5)) for _ in range(1600)])
+    grid.unblock(0)
+    grid.unblock(1599)
+    return grid
+
+
+def test_converges_to_cheapest_path():
+    grid = _rough_grid()
+
+    result = solvers.ara_star(grid, 0, 1599)
+
+    assert result.found and result.bound == 1
+    assert result.cost == solvers.dijkstra(grid, 0, 1599).cost
+
+
+def test_bound_holds_between_improvements():
+    grid = _rough_grid()
+    optimal = solvers.dijkstra(grid, 0, 1599).cost
+    search = ARAStar(grid, 0, 1599)
+    limit, costs = 0, []
+    while True:
+        limit += 50
+        result = run(search.steps(Budget(max_expanded=limit)))
+        if not result.exhausted:
+            break
+        if result.found:
+            assert optimal <= result.cost <= result.bound * optimal
+            costs.append(result.cost)
+
+    assert costs and costs == sorted(costs, reverse=True)
+    assert result.cost == optimal and result.bound == 1
+
+
+@pytest.mark.parametrize("options", [{"epsilon": 0.5}, {"decrease": 0}])
+def test_invalid_options(options):
+    with pytest.raises(ValueError):
+        ARAStar(Grid(4, 4), 0, 15, **options)
@@ -0,0 +1,50 @@
+import pytest
+
+from pathfinding import solvers
+from pathfinding.batch import BatchSolver, solve_all
+from pathfinding.grid import Grid
+
+
+def _wall_grid():
+    """12x12 weighted grid with a wall across row 6, open at its left end."""
+
+    grid = Grid(12, 12, weights=[1 + cell % 3 for cell in range(144)])
+    for x in range(1, 12):
+        grid.block(grid.index(x, 6))
+    return grid
+
+
+def _queries(grid):
+    return [(grid.index(x, 0), grid.index(11 - x, 11)) for x in range(12)]
+
+
+def test_solve_all_matches_solve():
+    grid = _wall_grid()
+    queries = _queries(grid)
+
+    results = solve_all(grid, queries, "dijkstra", processes=2)
+
+    assert results == [solvers.solve(grid, start, goal, "dijkstra")
+                       for start, goal in queries]
+
+
+def test_sync_shares_edits():
+    grid = _wall_grid()
+    queries = _queries(grid)
+    with BatchSolver(grid, processes=2) as batch:
+        dict(batch.solve(queries))
+        # Opening the wall on the right shortens the paths ending there
+        grid.unblock(grid.index(11, 6))
+        batch.sync()
+
+        results = dict(batch.solve(queries))
+
+    assert [results[index] for index in range(len(queries))] == [
+        solvers.astar(grid, start, goal) for start, goal in queries]
+
+
+def test_unknown_algorithm():
+    grid = _wall_grid()
+    with BatchSolver(grid, processes=2) as batch:
+        with pytest.raises(ValueError):
+            list(batch.solve(_queries(grid), "teleport"))
@@ -0,0 +1,58 @@
+import pytest
+
+from pathfinding import solvers
+from pathfinding.budgets import CELL_BYTES, Budget
+from pathfinding.grid import Grid
+
+
+def _pillar_grid():
+    """30x30 grid with a pillar at every odd x and y, so that even jps has
+    many cells to expand.
+    """
+
+    grid = Grid(30, 30)
+    for y in range(1, 30, 2):
+        for x in range(1, 30, 2):
+            grid.block(grid.index(x, y))
+    return grid
+
+
+def test_budget_limits():
+    deadline = Budget().deadline()
+    assert deadline is None
+    assert not Budget().exhausted(deadline, 10 ** 9, 10 ** 9)
+
+    assert not Budget(max_expanded=5).exhausted(None, 4, 0)
+    assert Budget(max_expanded=5).exhausted(None, 5, 0)
+
+    assert not Budget(max_memory=10 * CELL_BYTES).exhausted(None, 0, 10)
+    assert Budget(max_memory=10 * CELL_BYTES).exhausted(None, 0, 11)
+
+    budget = Budget(seconds=0)
+    assert budget.exhausted(budget.deadline(), 0, 0)
+    budget = Budget(seconds=60)
+    assert not budget.exhausted(budget.deadline(), 0, 0)
+
+
+@pytest.mark.parametrize("algorithm", sorted(set(solvers.ALGORITHMS)
+                                             - {"dstar_lite"}))
+def test_exhausted_search_returns_partial_path(algorithm):
+    grid = _pillar_grid()
+
+    result = solvers.solve(grid, 0, len(grid) - 1, algorithm,
+                           budget=Budget(max_expanded=20))
+
+    assert result.exhausted and not result.found
+    assert result.path and result.path[0] == 0
+    for cell, following in zip(result.path, result.path[1:]):
+        assert following in grid.neighbours(cell)
+    assert result.cost == solvers.path_cost(grid, result.path)
+
+
+def test_large_budget_changes_nothing():
+    grid = _pillar_grid()
+
+    result = solvers.astar(grid, 0, len(grid) - 1,
+                           budget=Budget(seconds=60, max_expanded=10 ** 6))
+
+    assert result == solvers.astar(grid, 0, len(grid) - 1)
@@ -0,0 +1,71 @@
+from pathfinding import solvers
+from pathfinding.budgets import Budget
+from pathfinding.cache import PathCache
+from pathfinding.grid import Grid
+
+
+def _open_grid():
+    """8x8 grid without walls."""
+
+    return Grid(8, 8)
+
+
+def test_repeated_query_is_a_hit():
+    grid = _open_grid()
+    cache = PathCache()
+
+    first = cache.solve(grid, 0, 63)
+    second = cache.solve(grid, 0, 63)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second == first == solvers.astar(grid, 0, 63)
+
+
+def test_edit_invalidates_results():
+    grid = _open_grid()
+    cache = PathCache()
+    cache.solve(grid, 0, 7)
+    grid.block(3)
+
+    result = cache.solve(grid, 0, 7)
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert 3 not in result.path
+    assert result.cost == solvers.astar(grid, 0, 7).cost
+
+
+def test_least_recently_used_result_is_evicted():
+    grid = _open_grid()
+    cache = PathCache(maxsize=2)
+    cache.solve(grid, 0, 1)
+    cache.solve(grid, 0, 2)
+    cache.solve(grid, 0, 1)
+    cache.solve(grid, 0, 3)
+    assert len(cache) == 2
+
+    cache.solve(grid, 0, 1)
+    cache.solve(grid, 0, 2)
+
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_exhausted_results_are_not_cached():
+    grid = _open_grid()
+    cache = PathCache()
+    budget = Budget(max_expanded=3)
+
+    result = cache.solve(grid, 0, 63, budget=budget)
+    cache.solve(grid, 0, 63, budget=budget)
+
+    assert result.exhausted
+    assert (len(cache), cache.misses) == (0, 2)
+
+
+def test_returned_paths_are_copies():
+    grid = _open_grid()
+    cache = PathCache()
+    cache.solve(grid, 0, 9).path.clear()
+
+    result = cache.solve(grid, 0, 9)
+
+    assert result.path[0] == 0 and result.path[-1] == 9
@@ -0,0 +1,133 @@
+import random
+
+import pytest
+
+from pathfinding import solvers
+from pathfinding.grid import Grid
+from pathfinding.hierarchical import ClusterGraph
+from pathfinding.incremental import DStarLite
+from pathfinding.jps import JumpTable
+from pathfinding.landmarks import LandmarkTable
+
+CASES = 300
+
+
+def _random_case(seed):
+    """Grid of random size, density and weights, with two open cells."""
+
+    rng = random.Random(seed)
+    width, height = rng.randint(1, 24), rng.randint(1, 24)
+    size = width * height
+    density = rng.choice((0.0, 0.1, 0.3, 0.45))
+    weights = ([rng.choice((1, 1, 2, 3)) for _ in range(size)]
+               if seed % 2 else None)
+    grid = Grid(width, height, [rng.random() < density for _ in range(size)],
+                weights)
+    start, goal = rng.randrange(size), rng.randrange(size)
+    grid.fill([0 if cell in (start, goal) else blocked
+               for cell, blocked in enumerate(grid.blocked)], grid.weights)
+    return grid, start, goal, rng
+
+
+def _check_path(grid, result, start, goal):
+    path = result.path
+    assert path[0] == start and path[-1] == goal
+    for cell, following in zip(path, path[1:]):
+        assert following in grid.neighbours(cell)
+    assert solvers.path_cost(grid, path) == result.cost
+
+
+@pytest.mark.parametrize("algorithm", ["astar", "alt", "jps",
+                                       "bidirectional_astar",
+                                       "bidirectional_dijkstra",
+                                       "dstar_lite", "ara_star"])
+def test_optimal_solvers_match_dijkstra(algorithm):
+    for seed in range(CASES):
+        grid, start, goal, _ = _random_case(seed)
+        expected = solvers.dijkstra(grid, start, goal)
+
+        result = solvers.solve(grid, start, goal, algorithm)
+
+        assert (result.found, result.cost) == (expected.found,
+                                               expected.cost), seed
+        if result.found:
+            _check_path(grid, result, start, goal)
+
+
+def test_precomputed_tables_match_dijkstra():
+    for seed in range(CASES):
+        grid, start, goal, _ = _random_case(seed)
+        expected = solvers.dijkstra(grid, start, goal)
+
+        for result in (
+                solvers.jps(grid, start, goal, jump_table=JumpTable(grid)),
+                solvers.alt(grid, start, goal,
+                            landmarks=LandmarkTable(grid, count=3))):
+            assert (result.found, result.cost) == (expected.found,
+                                                   expected.cost), seed
+
+
+def test_weighted_astar_stays_within_its_bound():
+    for seed in range(CASES):
+        grid, start, goal, _ = _random_case(seed)
+        expected = solvers.dijkstra(grid, start, goal)
+
+        result = solvers.weighted_astar(grid, start, goal, epsilon=2.0)
+
+        assert result.found == expected.found, seed
+        if result.found:
+            _check_path(grid, result, start, goal)
+            assert result.cost <= 2.0 * expected.cost
+
+
+def test_dstar_lite_replans_after_edits():
+    for seed in range(CASES // 2):
+        grid, start, goal, rng = _random_case(seed)
+        planner = DStarLite(grid, start, goal)
+        for _ in range(6):
+            result = planner.plan()
+            expected = solvers.dijkstra(grid, planner.start, goal)
+            assert (result.found, result.cost) == (expected.found,
+                                                   expected.cost), seed
+            if not result.found:
+                break
+            _check_path(grid, result, planner.start, goal)
+            if len(result.path) > 1:
+                planner.move_to(result.path[1])
+
+            for _ in range(rng.randint(0, 4)):
+                cell = rng.randrange(len(grid))
+                if cell in (goal, planner.start):
+                    continue
+                if grid.blocked[cell]:
+                    grid.unblock(cell)
+                else:
+                    grid.block(cell)
+                planner.update_cell(cell)
+
+
+def test_hpa_paths_are_valid_after_edits():
+    for seed in range(CASES // 2):
+        grid, start, goal, rng = _random_case(seed)
+        cluster_size = rng.randint(2, 8)
+        clusters = ClusterGraph(grid, cluster_size)
+        grid.listeners.append(clusters.update_cell)
+        for _ in range(4):
+            for _ in range(rng.randint(0, 4)):
+                cell = rng.randrange(len(grid))
+                if cell in (start, goal):
+                    continue
+                if rng.random() < 0.5:
+                    grid.block(cell)
+                else:
+                    grid.unblock(cell)
+            expected = solvers.dijkstra(grid, start, goal)
+
+            result = solvers.hpa(grid, start, goal, clusters=clusters)
+            fresh = ClusterGraph(grid, cluster_size).search(start, goal)
+
+            assert result.found == expected.found, seed
+            assert (result.path, result.cost) == (fresh.path, fresh.cost)
+            if result.found:
+                _check_path(grid, result, start, goal)
+                assert result.cost >= expected.cost
@@ -0,0 +1,72 @@
+from pathfinding import solvers
+from pathfinding.events import Observer, TraceRecorder
+from pathfinding.grid import Grid
+
+
+class _Log(Observer):
+    """Observer keeping every event as a tuple."""
+
+    def __init__(self):
+        self.events = []
+
+    def push(self, cell, g):
+        self.events.append(("push", cell, g))
+
+    def relax(self, cell, g):
+        self.events.append(("relax", cell, g))
+
+    def pop(self, cell):
+        self.events.append(("pop", cell))
+
+    def close(self, cell):
+        self.events.append(("close", cell))
+
+    def path_found(self, path, cost):
+        self.events.append(("path_found", path, cost))
+
+
+def _weighted_grid():
+    """9x9 grid of varied weights with a wall across column 4."""
+
+    grid = Grid(9, 9, weights=[1 + (cell * 7) % 5 for cell in range(81)])
+    for y in range(1, 9):
+        grid.block(grid.index(4, y))
+    return grid
+
+
+def test_events_come_in_order():
+    grid = _weighted_grid()
+    log = _Log()
+
+    result = solvers.dijkstra(grid, 0, 80, observer=log)
+
+    queued, closed, cost = {}, set(), {}
+    for kind, cell, *value in log.events[:-1]:
+        if kind == "push":
+            assert cell not in queued and cell not in closed
+            queued[cell] = cost[cell] = value[0]
+        elif kind == "relax":
+            assert value[0] < queued[cell]
+            queued[cell] = cost[cell] = value[0]
+        elif kind == "pop":
+            del queued[cell]
+        else:
+            assert kind == "close" and cell not in queued
+            closed.add(cell)
+    assert log.events[-1] == ("path_found", result.path, result.cost)
+    assert cost[80] == result.cost
+
+
+def test_trace_replays_the_search(tmp_path):
+    grid = _weighted_grid()
+    log, recorder = _Log(), TraceRecorder()
+    solvers.astar(grid, 0, 80, observer=log)
+    solvers.astar(grid, 0, 80, observer=recorder)
+    file_path = str(tmp_path / "search.trace")
+    recorder.save(file_path)
+
+    replayed = _Log()
+    TraceRecorder.load(file_path).replay(replayed)
+
+    assert replayed.events == log.events
+    assert len(recorder) == len(log.events) + len(log.events[-1][1])
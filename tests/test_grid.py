@@ -0,0 +1,18 @@
+from pathfinding.grid import Grid
+
+
+def test_weight_range_follows_fill():
+    grid = Grid(3, 1, weights=(2, 7, 3))
+    assert grid.weight_range() == (2, 7)
+
+    grid.block(0)
+    grid.clean()
+    assert grid.weight_range() == (2, 7)
+
+    grid.fill(bytes(3), (1, 4, 1))
+    assert grid.weight_range() == (1, 4)
+    assert grid.copy().weight_range() == (1, 4)
+
+
+def test_weight_range_of_empty_grid():
+    assert Grid(0, 0).weight_range() is None
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from pathfinding.heaps import BucketQueue, IndexedHeap
+
+
+def _drain(queue):
+    popped = []
+    while queue:
+        popped.append(queue.pop())
+    return popped
+
+
+@pytest.mark.parametrize("queue_class", [IndexedHeap,
+                                         lambda: BucketQueue(10)])
+def test_push_only_lowers_priorities(queue_class):
+    queue = queue_class()
+
+    assert queue.push("a", (5, 2))
+    assert not queue.push("a", (6, 0))
+    assert queue.push("a", (5, 1))
+
+    assert len(queue) == 1 and "a" in queue
+    assert queue.priority("a") == (5, 1)
+    assert _drain(queue) == [((5, 1), "a")]
+
+
+@pytest.mark.parametrize("queue_class", [IndexedHeap,
+                                         lambda: BucketQueue(10)])
+def test_ties_on_f_prefer_lower_h(queue_class):
+    queue = queue_class()
+    for item, priority in ((4, (3, 3)), (1, (4, 3)), (2, (4, 0)),
+                           (3, (4, 3)), (5, (4, 1))):
+        queue.push(item, priority)
+
+    assert queue.peek() == ((3, 3), 4)
+    assert [item for _, item in _drain(queue)] == [4, 2, 5, 1, 3]
+
+
+def test_queues_pop_in_the_same_order():
+    rng = random.Random(0)
+    heap, buckets = IndexedHeap(), BucketQueue(8)
+    last = 0
+    for _ in range(2000):
+        if heap and rng.random() < 0.4:
+            popped = heap.pop()
+            assert buckets.pop() == popped
+            last = popped[0][0]
+        else:
+            item = rng.randrange(50)
+            priority = (last + rng.randrange(9), rng.randrange(5))
+            assert heap.push(item, priority) == buckets.push(item, priority)
+        assert len(heap) == len(buckets)
+    assert _drain(heap) == _drain(buckets)
+
+
+def test_bucket_queue_rejects_priorities_out_of_range():
+    queue = BucketQueue(3)
+    queue.push("a", (10, 0))
+
+    with pytest.raises(ValueError):
+        queue.push("b", (14, 0))
+    with pytest.raises(ValueError):
+        queue.push("b", (9, 0))
+
+
+def test_indexed_heap_update_and_remove():
+    heap = IndexedHeap()
+    for item in range(10):
+        heap.push(item, item)
+
+    heap.update(0, 20)
+    heap.remove(5)
+
+    assert heap.stale_pops == 0
+    assert [item for _, item in _drain(heap)] == [1, 2, 3, 4, 6, 7, 8, 9, 0]
+    with pytest.raises(IndexError):
+        heap.pop()
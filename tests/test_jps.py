@@ -0,0 +1,40 @@
+import pytest
+
+from pathfinding import solvers
+from pathfinding.grid import Grid
+from pathfinding.jps import JumpTable
+
+
+def _grid():
+    grid = Grid(8, 8)
+    for y in range(1, 8):
+        grid.block(grid.index(3, y))
+    grid.set_objective(grid.index(7, 7))
+    return grid
+
+
+def test_jps_with_table_matches_dijkstra():
+    grid = _grid()
+
+    result = solvers.jps(grid, 0, grid.goal, jump_table=JumpTable(grid))
+
+    assert result.cost == solvers.dijkstra(grid, 0, grid.goal).cost
+
+
+def test_jps_refuses_table_of_edited_terrain():
+    grid = _grid()
+    table = JumpTable(grid)
+    grid.block(grid.index(3, 0))
+
+    assert not table.matches(grid)
+    with pytest.raises(ValueError):
+        solvers.jps(grid, 0, grid.goal, jump_table=table)
+
+
+def test_table_survives_clean():
+    grid = _grid()
+    table = JumpTable(grid)
+    grid.clean()
+
+    assert table.matches(grid)
+    assert table.version == grid.version
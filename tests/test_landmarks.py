@@ -0,0 +1,51 @@
+import pytest
+
+from pathfinding import maps, solvers
+from pathfinding.grid import Grid
+from pathfinding.landmarks import LandmarkTable
+
+
+def _corridor_grid():
+    """10x10 grid with a wall across row 5, open at its right end."""
+
+    grid = Grid(10, 10)
+    for x in range(9):
+        grid.block(grid.index(x, 5))
+    grid.set_objective(grid.index(0, 9))
+    return grid
+
+
+def test_alt_matches_astar():
+    grid = _corridor_grid()
+    table = LandmarkTable(grid, count=4)
+
+    result = solvers.alt(grid, 0, grid.goal, landmarks=table)
+
+    assert result.found
+    assert result.cost == solvers.astar(grid, 0, grid.goal).cost
+
+
+def test_alt_refuses_table_of_edited_terrain():
+    grid = _corridor_grid()
+    table = LandmarkTable(grid, count=4)
+    # Opening the wall makes the detour the table knows about unnecessary
+    grid.unblock(grid.index(0, 5))
+
+    assert not table.matches(grid)
+    with pytest.raises(ValueError):
+        solvers.alt(grid, 0, grid.goal, landmarks=table)
+
+    result = solvers.alt(grid, 0, grid.goal,
+                         landmarks=LandmarkTable(grid, count=4))
+    assert result.cost == solvers.astar(grid, 0, grid.goal).cost
+
+
+def test_loaded_table_matches_by_checksum_once(tmp_path):
+    grid = _corridor_grid()
+    file_path = str(tmp_path / "corridor.pflm")
+    maps.save_landmarks(file_path, LandmarkTable(grid, count=2))
+    table = maps.load_landmarks(file_path, grid)
+    assert table.version is None
+
+    assert table.matches(grid)
+    assert table.version == grid.version
@@ -0,0 +1,52 @@
+from pathfinding import maps
+from pathfinding.grid import Grid
+from pathfinding.landmarks import LandmarkTable
+
+
+def _grid():
+    grid = Grid(6, 4)
+    grid.block(grid.index(2, 1))
+    grid.set_objective(grid.index(5, 3))
+    return grid
+
+
+def test_save_over_mapped_file_closes_mapping(tmp_path):
+    file_path = str(tmp_path / "terrain.pfmap")
+    maps.save(file_path, _grid(), start=0)
+    grid, _ = maps.load(file_path, mapped=True)
+    mapping = grid.blocked.obj
+
+    grid.block(grid.index(0, 3))
+    maps.save(file_path, grid, start=0)
+
+    # Windows can't replace a file that is still mapped
+    assert mapping.closed
+    assert isinstance(grid.blocked, bytearray)
+    saved, start = maps.load(file_path, mapped=False)
+    assert saved.blocked == grid.blocked and saved.weights == grid.weights
+    assert (start, saved.goal) == (0, grid.goal)
+
+
+def test_save_landmarks_over_mapped_file(tmp_path):
+    grid = _grid()
+    file_path = str(tmp_path / "terrain.pflm")
+    maps.save_landmarks(file_path, LandmarkTable(grid, count=2))
+    table = maps.load_landmarks(file_path, grid, mapped=True)
+    mapping = table.distances[0].obj
+
+    maps.save_landmarks(file_path, table)
+
+    assert mapping.closed
+    assert maps.load_landmarks(file_path, grid).distances == table.distances
+
+
+def test_open_landmarks_rebuilds_after_edit(tmp_path):
+    grid = _grid()
+    map_path = str(tmp_path / "terrain.pfmap")
+    maps.open_landmarks(map_path, grid, count=2)
+
+    grid.block(grid.index(3, 2))
+    table = maps.open_landmarks(map_path, grid, count=2)
+
+    assert table.matches(grid)
+    assert maps.load_landmarks(maps.landmarks_path(map_path), grid).matches(grid)
@@ -0,0 +1,27 @@
+from pathfinding import maps, solvers, wavefront
+from pathfinding.grid import Grid
+
+
+def _saved_grid(tmp_path):
+    grid = Grid(12, 8)
+    for y in range(6):
+        grid.block(grid.index(5, y))
+    grid.set_objective(grid.index(11, 0))
+    file_path = str(tmp_path / "wall.pfmap")
+    maps.save(file_path, grid, start=0)
+    return grid, file_path
+
+
+def test_wavefront_on_mapped_grid(tmp_path):
+    grid, file_path = _saved_grid(tmp_path)
+    mapped, start = maps.load(file_path, mapped=True)
+    assert isinstance(mapped.blocked, memoryview)
+
+    result = wavefront.bfs(mapped, start, mapped.goal)
+
+    assert result.found
+    assert result.cost == solvers.bfs(grid, start, grid.goal).cost
+    assert (wavefront.distance_field(mapped, start)
+            == wavefront.distance_field(grid, start))
+    assert (wavefront.reachable(mapped, start)
+            == wavefront.reachable(grid, start))